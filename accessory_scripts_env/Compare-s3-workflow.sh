@@ -21,7 +21,7 @@ rm all-s3-buckets.txt all-s3-data.txt
 # is for those that have already been archived.
 cat new-fastq-archive-mapping.txt | cut -f1 | sort -k1,1 -u > local-files.txt
 python ~/pipeline/data-archiver/compare_s3_files.py -l local-files.txt -s s3-files.txt \
-    -u unmatched-files.txt -m s3-mappings.txt -w 14 -v
+    -u unmatched-files.txt -m s3-mappings.txt -v
 rm local-files.txt s3-files.txt
 
 # Then convert s3-mappings.txt to 3 column format (local file, archive directory, archive filename) for use in the archive workflow.
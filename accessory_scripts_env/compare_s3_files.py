@@ -9,18 +9,28 @@ S3 bucket contents, producing two outputs:
 """
 
 import argparse
+import mmap
 import os
-import re
 import sys
-from collections import defaultdict
-from concurrent.futures import ProcessPoolExecutor, as_completed
+from operator import itemgetter
 from pathlib import Path
-from typing import Dict, List, Set, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
+# Optional: marisa-trie gives a much more compact filename index for large listings
+try:
+    import marisa_trie
+except ImportError:
+    marisa_trie = None
 
-def parse_s3_listing(s3_file: Path) -> Dict[str, List[str]]:
+
+def _basename(path: str) -> str:
+    """Return the final component of a POSIX path (faster than os.path.basename)."""
+    return path.rpartition('/')[2]
+
+
+def iter_s3_listing(s3_file: Path) -> Iterator[Tuple[str, str]]:
     """
-    Parse AWS S3 bucket listing file.
+    Read the files from an AWS S3 bucket listing file, one at a time.
     
     Expected format from 'aws s3 ls --recursive':
     2019-08-16 18:22:45   1234  s3://bucket/path/to/file.ext
@@ -30,39 +40,66 @@ def parse_s3_listing(s3_file: Path) -> Dict[str, List[str]]:
     Args:
         s3_file: Path to file containing S3 listing
         
-    Returns:
-        Dictionary mapping filename to list of full S3 paths
+    Yields:
+        (filename, s3_path) tuples, in listing order (directories are skipped)
     """
-    filename_to_s3paths: Dict[str, List[str]] = defaultdict(list)
-    
-    # Pattern to match S3 listing format
-    # Date Time Size s3://path or Date Time DIROBJ s3://path
-    pattern = re.compile(r'^\s*\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}\s+(?:\d+[KMGT]?|DIROBJ)\s+(s3://.+)$')
-    
-    with open(s3_file, 'r') as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            
-            match = pattern.match(line)
-            if match:
-                s3_path = match.group(1)
+    # Memory-map the listing and read it as bytes, only decoding the path column
+    # of listing lines (an empty file cannot be mapped and has nothing to parse)
+    with open(s3_file, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for line in iter(mm.readline, b''):
+                # Listing lines have fixed columns: Date Time Size s3://path
+                # (splitting at most 3 times keeps any spaces in the path intact)
+                parts = line.split(None, 3)
+                if len(parts) != 4:
+                    continue
+                
+                date, _, _, raw_path = parts
+                if len(date) != 10 or date[4:5] != b'-':
+                    continue
+                
+                raw_path = raw_path.rstrip()
+                if not raw_path.startswith(b's3://'):
+                    continue
                 
                 # Skip directories (paths ending with /)
-                if s3_path.endswith('/'):
+                if raw_path.endswith(b'/'):
                     continue
                 
-                # Extract filename from S3 path
-                filename = os.path.basename(s3_path)
+                s3_path = raw_path.decode('utf-8')
                 
-                # Store mapping
-                filename_to_s3paths[filename].append(s3_path)
+                # Extract filename from S3 path
+                yield _basename(s3_path), s3_path
+
+
+def parse_s3_listing(s3_file: Path) -> Dict[str, List[str]]:
+    """
+    Parse AWS S3 bucket listing file (see iter_s3_listing).
+    
+    Args:
+        s3_file: Path to file containing S3 listing
+        
+    Returns:
+        Dictionary mapping filename to list of full S3 paths
+    """
+    filename_to_s3paths: Dict[str, List[str]] = {}
+    get_paths = filename_to_s3paths.get
+    
+    for filename, s3_path in iter_s3_listing(s3_file):
+        # Store mapping (most filenames are seen once, so look up only once)
+        paths = get_paths(filename)
+        if paths is None:
+            filename_to_s3paths[filename] = [s3_path]
+        else:
+            paths.append(s3_path)
     
     return filename_to_s3paths
 
 
-def parse_local_file_list(local_file: Path) -> List[str]:
+def parse_local_file_list(local_file: Path) -> List[Tuple[str, str]]:
     """
     Parse local file list (one path per line).
     
@@ -70,7 +107,7 @@ def parse_local_file_list(local_file: Path) -> List[str]:
         local_file: Path to file containing local file paths
         
     Returns:
-        List of local file paths
+        List of (local_path, filename) tuples
     """
     local_paths = []
     
@@ -78,135 +115,110 @@ def parse_local_file_list(local_file: Path) -> List[str]:
         for line in f:
             line = line.strip()
             if line and not line.startswith('#'):
-                local_paths.append(line)
+                local_paths.append((line, _basename(line)))
     
     return local_paths
 
 
-def compare_file_chunk(local_paths_chunk: List[str], 
-                      s3_filename_map: Dict[str, List[str]]) -> Tuple[List[str], List[Tuple[str, List[str]]]]:
+def build_filename_trie(s3_file: Path) -> 'marisa_trie.BytesTrie':
     """
-    Compare a chunk of local files with S3 files by filename.
+    Build a marisa BytesTrie mapping filename to S3 paths straight from an S3 listing.
+    
+    Sequencing filenames share long prefixes, so the trie takes a fraction of the
+    memory of the equivalent dictionary, and it is filled as the listing is read
+    so the dictionary is never built. Multiple S3 paths for the same filename are
+    stored as separate values and come back in sorted order. Unlike
+    parse_s3_listing, the same S3 path listed more than once is stored once.
     
     Args:
-        local_paths_chunk: Chunk of local file paths to process
-        s3_filename_map: Dictionary mapping filename to S3 paths
+        s3_file: Path to file containing S3 listing
         
     Returns:
-        Tuple of (unmatched_files, matched_mappings) for this chunk
+        BytesTrie mapping filename to UTF-8 encoded S3 paths
     """
-    unmatched_files = []
-    matched_mappings = []
-    
-    for local_path in local_paths_chunk:
-        filename = os.path.basename(local_path)
-        
-        if filename in s3_filename_map:
-            # Found match(es) in S3
-            s3_paths = s3_filename_map[filename]
-            matched_mappings.append((local_path, s3_paths))
-        else:
-            # No match found
-            unmatched_files.append(local_path)
-    
-    return unmatched_files, matched_mappings
+    return marisa_trie.BytesTrie(
+        (filename, s3_path.encode('utf-8'))
+        for filename, s3_path in iter_s3_listing(s3_file)
+    )
 
 
-def compare_files(local_paths: List[str], 
-                 s3_filename_map: Dict[str, List[str]],
-                 max_workers: int = None,
-                 verbose: bool = False) -> Tuple[List[str], List[Tuple[str, List[str]]]]:
+def compare_files(local_paths: List[Tuple[str, str]], 
+                 s3_filename_map: Union[Dict[str, List[str]], 'marisa_trie.BytesTrie']
+                 ) -> Iterator[Tuple[str, Optional[List[str]]]]:
     """
-    Compare local files with S3 files by filename using parallel processing.
+    Compare local files with S3 files by filename.
+    
+    Results are yielded one local file at a time (in input order) so they can be
+    written out as they are produced rather than collected in memory first.
     
     Args:
-        local_paths: List of local file paths
-        s3_filename_map: Dictionary mapping filename to S3 paths
-        max_workers: Maximum number of worker processes (None = CPU count)
-        verbose: Print progress information
+        local_paths: List of (local_path, filename) tuples
+        s3_filename_map: Dictionary (or BytesTrie from build_filename_trie) mapping filename to S3 paths
         
-    Returns:
-        Tuple of (unmatched_files, matched_mappings)
-        - unmatched_files: List of local paths with no S3 match
-        - matched_mappings: List of (local_path, [s3_paths]) tuples
+    Yields:
+        (local_path, s3_paths) tuples, where s3_paths is None for files with no S3 match
     """
-    # If file list is small, don't bother with parallel processing
-    if len(local_paths) < 100:
-        return compare_file_chunk(local_paths, s3_filename_map)
-    
-    # Split local_paths into chunks for parallel processing
-    if max_workers is None:
-        max_workers = os.cpu_count() or 4
+    get_s3_paths = s3_filename_map.get
     
-    chunk_size = max(1, len(local_paths) // (max_workers * 4))  # 4 chunks per worker
-    chunks = [local_paths[i:i + chunk_size] for i in range(0, len(local_paths), chunk_size)]
+    if marisa_trie is not None and isinstance(s3_filename_map, marisa_trie.BytesTrie):
+        for local_path, filename in local_paths:
+            s3_paths = get_s3_paths(filename)
+            yield local_path, ([p.decode('utf-8') for p in s3_paths] if s3_paths else None)
+        return
     
-    if verbose:
-        print(f"  Using {max_workers} workers to process {len(chunks)} chunks")
-        print(f"  Chunk size: ~{chunk_size} files")
-    
-    unmatched_files = []
-    matched_mappings = []
-    
-    # Process chunks in parallel
-    with ProcessPoolExecutor(max_workers=max_workers) as executor:
-        # Submit all chunks for processing
-        future_to_chunk = {executor.submit(compare_file_chunk, chunk, s3_filename_map): i 
-                          for i, chunk in enumerate(chunks)}
-        
-        # Collect results as they complete
-        completed = 0
-        for future in as_completed(future_to_chunk):
-            chunk_unmatched, chunk_matched = future.result()
-            unmatched_files.extend(chunk_unmatched)
-            matched_mappings.extend(chunk_matched)
-            
-            completed += 1
-            if verbose and completed % max(1, len(chunks) // 10) == 0:
-                progress = (completed / len(chunks)) * 100
-                print(f"  Progress: {completed}/{len(chunks)} chunks ({progress:.1f}%)")
-    
-    return unmatched_files, matched_mappings
+    for local_path, filename in local_paths:
+        yield local_path, get_s3_paths(filename)
 
 
-def write_unmatched_files(unmatched: List[str], output_file: Path):
+def write_comparison_results(results: Iterable[Tuple[str, Optional[List[str]]]],
+                             unmatched_file: Path,
+                             matched_file: Path) -> Tuple[int, int, int]:
     """
-    Write unmatched files to output file.
+    Stream comparison results to the unmatched files and matched mappings outputs.
     
-    Args:
-        unmatched: List of unmatched local file paths
-        output_file: Path to output file
-    """
-    with open(output_file, 'w') as f:
-        f.write("# Local files with no matching filename in S3\n")
-        f.write("# Format: local_file_path\n")
-        f.write("#" + "=" * 78 + "\n")
-        for filepath in sorted(unmatched):
-            f.write(f"{filepath}\n")
-    
-    print(f"Unmatched files written to: {output_file}")
-
-
-def write_matched_mappings(matched: List[Tuple[str, List[str]]], output_file: Path):
-    """
-    Write matched file mappings to output file.
+    Rows are written in the order they are received, so callers wanting sorted
+    outputs should sort the local file list before comparing.
     
     Args:
-        matched: List of (local_path, [s3_paths]) tuples
-        output_file: Path to output file
+        results: Iterable of (local_path, s3_paths) tuples from compare_files()
+        unmatched_file: Path to output file for unmatched local file paths
+        matched_file: Path to output file for matched file mappings
+        
+    Returns:
+        Tuple of (unmatched_count, matched_count, multi_match_count)
     """
-    with open(output_file, 'w') as f:
-        f.write("# Mappings between local files and S3 locations\n")
-        f.write("# Format: local_file_path<TAB>s3_path(s)\n")
-        f.write("# Note: Multiple S3 paths are separated by ' | '\n")
-        f.write("#" + "=" * 78 + "\n")
+    unmatched_count = 0
+    matched_count = 0
+    multi_match_count = 0
+    
+    with open(unmatched_file, 'w') as uf, open(matched_file, 'w') as mf:
+        uf.write("# Local files with no matching filename in S3\n")
+        uf.write("# Format: local_file_path\n")
+        uf.write("#" + "=" * 78 + "\n")
         
-        for local_path, s3_paths in sorted(matched):
-            # Join multiple S3 paths with separator
-            s3_paths_str = ' | '.join(s3_paths)
-            f.write(f"{local_path}\t{s3_paths_str}\n")
-    
-    print(f"Matched mappings written to: {output_file}")
+        mf.write("# Mappings between local files and S3 locations\n")
+        mf.write("# Format: local_file_path<TAB>s3_path(s)\n")
+        mf.write("# Note: Multiple S3 paths are separated by ' | '\n")
+        mf.write("#" + "=" * 78 + "\n")
+        
+        write_unmatched = uf.write
+        write_matched = mf.write
+        
+        for local_path, s3_paths in results:
+            if s3_paths is None:
+                write_unmatched(f"{local_path}\n")
+                unmatched_count += 1
+            else:
+                # Join multiple S3 paths with separator
+                write_matched(f"{local_path}\t{' | '.join(s3_paths)}\n")
+                matched_count += 1
+                if len(s3_paths) > 1:
+                    multi_match_count += 1
+    
+    print(f"Unmatched files written to: {unmatched_file}")
+    print(f"Matched mappings written to: {matched_file}")
+    
+    return unmatched_count, matched_count, multi_match_count
 
 
 def print_summary(local_count: int, 
@@ -293,7 +305,14 @@ Note:
         '-w', '--workers',
         type=int,
         default=None,
-        help='Number of parallel workers (default: CPU count)'
+        help='Ignored; kept for compatibility with older workflows (comparison runs in a single process)'
+    )
+    
+    parser.add_argument(
+        '--trie',
+        action='store_true',
+        help='Store S3 filenames in a marisa-trie to reduce memory use on very large listings; '
+             'an S3 path listed more than once counts as one match (requires the marisa-trie package)'
     )
     
     args = parser.parse_args()
@@ -307,14 +326,23 @@ Note:
         print(f"Error: S3 listing file not found: {args.s3_listing}", file=sys.stderr)
         sys.exit(1)
     
+    if args.trie and marisa_trie is None:
+        print("Error: --trie requires the marisa-trie package (pip install marisa-trie)", file=sys.stderr)
+        sys.exit(1)
+    
     # Parse S3 listing
     if args.verbose:
         print(f"Parsing S3 listing from: {args.s3_listing}")
-    s3_filename_map = parse_s3_listing(args.s3_listing)
-    if args.verbose:
-        print(f"  Found {len(s3_filename_map)} unique filenames in S3")
-        total_s3_files = sum(len(paths) for paths in s3_filename_map.values())
-        print(f"  Total S3 file entries: {total_s3_files}")
+    if args.trie:
+        s3_filename_map = build_filename_trie(args.s3_listing)
+        if args.verbose:
+            print(f"  Packed {len(s3_filename_map)} distinct S3 file entries into a marisa-trie")
+    else:
+        s3_filename_map = parse_s3_listing(args.s3_listing)
+        if args.verbose:
+            print(f"  Found {len(s3_filename_map)} unique filenames in S3")
+            total_s3_files = sum(len(paths) for paths in s3_filename_map.values())
+            print(f"  Total S3 file entries: {total_s3_files}")
     
     # Parse local file list
     if args.verbose:
@@ -323,21 +351,18 @@ Note:
     if args.verbose:
         print(f"  Found {len(local_paths)} local files")
     
-    # Compare files
+    # Compare files, streaming results to the outputs (sorted by local path)
     if args.verbose:
         print("Comparing files by filename...")
-    unmatched_files, matched_mappings = compare_files(local_paths, s3_filename_map, 
-                                                      args.workers, args.verbose)
-    
-    # Count files with multiple S3 matches
-    multi_match_count = sum(1 for _, s3_paths in matched_mappings if len(s3_paths) > 1)
-    
-    # Write outputs
-    write_unmatched_files(unmatched_files, args.unmatched_output)
-    write_matched_mappings(matched_mappings, args.matched_output)
+    local_paths.sort(key=itemgetter(0))
+    unmatched_count, matched_count, multi_match_count = write_comparison_results(
+        compare_files(local_paths, s3_filename_map),
+        args.unmatched_output,
+        args.matched_output
+    )
     
     # Print summary
-    print_summary(len(local_paths), len(unmatched_files), len(matched_mappings), multi_match_count)
+    print_summary(len(local_paths), unmatched_count, matched_count, multi_match_count)
     
     if multi_match_count > 0:
         print(f"\n⚠ Warning: {multi_match_count} file(s) have multiple S3 locations")
@@ -45,7 +45,7 @@ fi
 python ~/pipeline/data-archiver/archive_organizer.py "$filtered_fastq" -o "$archive_additions" --ignore-file "$ignore_files"
 rm "$combined_fastq" "$filtered_fastq"
 
-# Now sync to the Tier 2 storage (using s3cmd) based on the generated mapping file.
+# Now sync to the Tier 2 storage (using the s3cmd credentials) based on the generated mapping file.
 python ~/pipeline/data-archiver/s3_sync.py "$archive_additions" --workers "$num_workers"
 
 # Finally add the new archive additions to the 'master' archive mapping file.  Make sure to remove any lines that 
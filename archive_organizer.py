@@ -8,7 +8,96 @@ import os
 import re
 from collections import defaultdict
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, Iterable, List, Tuple, Optional
+
+# Precompiled patterns used when parsing paths and cleaning up directory names
+_RESEARCHER_SUFFIX_RE = re.compile(r'[\-\_]?((RNA)|(ChIP)|(ATAC))\-?(seq)?$', re.IGNORECASE)
+_SEQ_RE = re.compile(r'((RNA)|(ChIP)|(ATAC))', re.IGNORECASE)
+_FASTQ_SUFFIX_RE = re.compile(r'.*\.fastq\.?g?z?$', re.IGNORECASE)
+_ORG_PREFIX_RE = re.compile(r'^((mm)|(hg)|(dm))\d+_')
+_DESC_CLEAN_RE = re.compile(r'^(?-i:(?:mm|hg|dm)\d+_)|(?:RNA|ChIP|ATAC)\-?(?:seq)?_?', re.IGNORECASE)
+
+# Get the filename from a path
+def _basename(path: str) -> str:
+    """Return the final component of a POSIX path (faster than os.path.basename)."""
+    return path.rpartition('/')[2]
+
+# Locate the data and FASTQ directory levels of a split file path
+def scan_path_parts(parts: List[str]) -> Tuple[Optional[int], Optional[int]]:
+    """
+    Find the data directory and FASTQ directory indices in a single pass over the path.
+    
+    Args:
+        parts: Path components (filepath.split('/'))
+        
+    Returns:
+        Tuple of (data_idx, fastq_idx), either of which may be None. data_idx is the
+        first 'data' directory, or the first 'external_data' directory if there is no 'data'.
+        As with matching '/data/' in the path string, a directory only counts if one
+        appears between two slashes, but then its first occurrence (even a leading one) is used.
+    """
+    data_idx: Optional[int] = None
+    external_idx: Optional[int] = None
+    fastq_idx: Optional[int] = None
+    has_data = False
+    has_external = False
+    last_idx = len(parts) - 1
+    
+    for i, part in enumerate(parts):
+        if part == 'data':
+            if data_idx is None:
+                data_idx = i
+            has_data = has_data or 0 < i < last_idx
+        elif part == 'external_data':
+            if external_idx is None:
+                external_idx = i
+            has_external = has_external or 0 < i < last_idx
+        elif fastq_idx is None and part in ('FASTQ', 'fastq'):
+            fastq_idx = i
+    
+    if has_data:
+        return data_idx, fastq_idx
+    if has_external:
+        return external_idx, fastq_idx
+    return None, fastq_idx
+
+# Build the base FASTQ directory from the scanned path components
+def build_base_fastq_dir(filepath: str, parts: List[str], fastq_idx: Optional[int]) -> str:
+    """
+    Get the base FASTQ directory (everything up to and including FASTQ/fastq).
+    
+    Args:
+        filepath: Full path to the file
+        parts: Path components (filepath.split('/'))
+        fastq_idx: Index of the FASTQ directory in parts, if any
+        
+    Returns:
+        Base FASTQ directory, or the file's directory if no FASTQ directory was found
+    """
+    if fastq_idx:
+        return '/'.join(parts[:fastq_idx + 1])
+    
+    # If no FASTQ directory found, use the directory of the file
+    return os.path.dirname(filepath)
+
+# Extract just the base FASTQ directory from file path (used for grouping)
+def extract_base_fastq_dir(filepath: str) -> str:
+    """
+    Get the grouping directory of a file path without parsing any other metadata.
+    
+    Args:
+        filepath: Full path to the file
+        
+    Returns:
+        Same value as the base_fastq_dir returned by extract_metadata()
+    """
+    parts = filepath.split('/')
+    data_idx, fastq_idx = scan_path_parts(parts)
+    
+    if data_idx is None:
+        return filepath
+    
+    return build_base_fastq_dir(filepath, parts, fastq_idx)
 
 # Extract metadata from file path
 def extract_metadata(filepath: str) -> Tuple[Optional[str], Optional[str], Optional[str], str]:
@@ -23,25 +112,18 @@ def extract_metadata(filepath: str) -> Tuple[Optional[str], Optional[str], Optio
     """
     parts = filepath.split('/')
     
-    # Find the data directory level (after /data/ or /external_data/)
-    try:
-        if '/data/' in filepath:
-            data_idx = parts.index('data')
-            remaining_path = '/'.join(parts[data_idx + 1:])
-        elif '/external_data/' in filepath:
-            data_idx = parts.index('external_data')
-            remaining_path = '/'.join(parts[data_idx + 1:])
-        else:
-            return None, None, None, filepath
-    except ValueError:
+    # Find the data directory level (after /data/ or /external_data/) and the FASTQ level
+    data_idx, fastq_idx = scan_path_parts(parts)
+    if data_idx is None:
         return None, None, None, filepath
+    remaining_path = '/'.join(parts[data_idx + 1:])
     
     # Get researcher/project name (first directory after /data/)
     researcher = parts[data_idx + 1] if data_idx + 1 < len(parts) else None
     
     # Remove ChIP-seq or RNA-seq suffixes from researcher name
     if researcher:
-        researcher = re.sub(r'[\-\_]?((RNA)|(ChIP)|(ATAC))\-?(seq)?$', '', researcher, flags=re.IGNORECASE)
+        researcher = _RESEARCHER_SUFFIX_RE.sub('', researcher)
     
     # Get experiment directory (second directory after /data/)
     experiment_dir = parts[data_idx + 2] if data_idx + 2 < len(parts) else None
@@ -60,14 +142,14 @@ def extract_metadata(filepath: str) -> Tuple[Optional[str], Optional[str], Optio
             exp_cleaned = exp_cleaned[len(researcher) + 1:]
         
         # Try to extract experiment type (RNA-seq, ChIP-seq, etc.)
-        seq_match = re.search(r'((RNA)|(ChIP)|(ATAC))', exp_cleaned, re.IGNORECASE)
+        seq_match = _SEQ_RE.search(exp_cleaned)
         if seq_match:
             experiment_type = seq_match.group(1) + '-seq'
             # Everything else is description
             description = exp_cleaned
         # Next try to find the patterns anywhere in the file path- prioritize the last match in the path
-        elif re.search(r'((RNA)|(ChIP)|(ATAC))', remaining_path, re.IGNORECASE):
-            all_matches = re.findall(r'((RNA)|(ChIP)|(ATAC))', remaining_path, re.IGNORECASE)
+        elif _SEQ_RE.search(remaining_path):
+            all_matches = _SEQ_RE.findall(remaining_path)
             seq_match = all_matches[-1][0]  # Get the last full match
             experiment_type = seq_match + '-seq'
             description = exp_cleaned
@@ -76,22 +158,10 @@ def extract_metadata(filepath: str) -> Tuple[Optional[str], Optional[str], Optio
             description = exp_cleaned
     
     # Check if the description is the actual sample name, and if so 'clear it'
-    sample_name_pattern = re.compile(r'.*\.fastq\.?g?z?$', re.IGNORECASE)
-    if sample_name_pattern.match(description):
+    if _FASTQ_SUFFIX_RE.match(description):
         description = None
     
-    # Get the base FASTQ directory (everything up to and including FASTQ/STAR/bbsplit)
-    fastq_idx: Optional[int] = None
-    for i, part in enumerate(parts):
-        if part in ['FASTQ', 'fastq']:
-            fastq_idx = i
-            break
-    
-    if fastq_idx:
-        base_fastq_dir = '/'.join(parts[:fastq_idx + 1])
-    else:
-        # If no FASTQ directory found, use the directory of the file
-        base_fastq_dir = os.path.dirname(filepath)
+    base_fastq_dir = build_base_fastq_dir(filepath, parts, fastq_idx)
     
     return researcher, experiment_type, description, base_fastq_dir
 
@@ -133,13 +203,15 @@ def propose_archive_directory(researcher: Optional[str],
         components.append(researcher)
     
     if description:
-        # Clean up description
+        # Clean up description (too short to hold a prefix or experiment type if <= 2 chars)
         desc_clean = description
-        # Remove organism prefixes like mm10_, hg38_
-        desc_clean = re.sub(r'^((mm)|(hg)|(dm))\d+_', '', desc_clean)
-        # Remove experiment type if already captured
-        if experiment_type:
-            desc_clean = re.sub(r'((RNA)|(ChIP)|(ATAC))\-?(seq)?_?', '', desc_clean, flags=re.IGNORECASE)
+        if len(desc_clean) > 2:
+            # Remove organism prefixes like mm10_, hg38_, plus the experiment type if
+            # already captured (both in a single pass)
+            if experiment_type:
+                desc_clean = _DESC_CLEAN_RE.sub('', desc_clean)
+            else:
+                desc_clean = _ORG_PREFIX_RE.sub('', desc_clean)
         # Remove leading/trailing underscores and hyphens
         desc_clean = desc_clean.strip('_-')
         
@@ -149,12 +221,12 @@ def propose_archive_directory(researcher: Optional[str],
     return '/'.join(components) if components else 'uncategorized'
 
 # Function to group files by their FASTQ directory
-def group_files_by_fastq_dir(filepaths: List[str]) -> Dict[str, List[str]]:
+def group_files_by_fastq_dir(filepaths: Iterable[str]) -> Dict[str, List[str]]:
     """
     Group files by their common FASTQ directory.
     
     Args:
-        filepaths: List of file paths
+        filepaths: Iterable of file paths (e.g. an open file, one path per line)
         
     Returns:
         Dictionary mapping base_fastq_dir to list of files
@@ -166,8 +238,8 @@ def group_files_by_fastq_dir(filepaths: List[str]) -> Dict[str, List[str]]:
         if not filepath:
             continue
         
-        _, _, _, base_fastq_dir = extract_metadata(filepath)
-        groups[base_fastq_dir].append(filepath)
+        # Only the base directory is needed here - full metadata is parsed once per group
+        groups[extract_base_fastq_dir(filepath)].append(filepath)
     
     return groups
 
@@ -200,7 +272,7 @@ def interactive_review(archive_proposals: Dict[str, Tuple[str, List[str]]],
         print(f"Number of files: {len(file_list)}")
         print(f"Example files (up to 3):")
         for example_file in file_list[:3]:
-            filename = os.path.basename(example_file)
+            filename = _basename(example_file)
             print(f"  - {filename}")
         if len(file_list) > 3:
             print(f"  ... and {len(file_list) - 3} more")
@@ -255,7 +327,7 @@ def generate_output_table(file_groups: Dict[str, List[str]],
             archive_dir = final_archive_dirs[base_fastq_dir]
             
             for filepath in sorted(file_list):
-                filename = os.path.basename(filepath)
+                filename = _basename(filepath)
                 archived_path = f"{archive_dir}/{filename}"
                 
                 f.write(f"{filepath}\t{archive_dir}\t{archived_path}\n")
@@ -298,13 +370,12 @@ def main() -> None:
     
     # Read input file
     print(f"Reading file paths from: {args.input_file}")
+    # Group files by FASTQ directory, streaming lines straight from the input file
     with open(args.input_file, 'r') as f:
-        filepaths: List[str] = f.readlines()
-    
-    print(f"Found {len(filepaths)} file paths")
+        file_groups = group_files_by_fastq_dir(f)
     
-    # Group files by FASTQ directory
-    file_groups = group_files_by_fastq_dir(filepaths)
+    total_files = sum(len(files) for files in file_groups.values())
+    print(f"Found {total_files} file paths")
     print(f"Grouped into {len(file_groups)} unique FASTQ directories")
     
     # Generate proposed archive directory names
@@ -326,7 +397,7 @@ def main() -> None:
     
     # Print summary
     print(f"\nSummary:")
-    print(f"  Total files: {sum(len(files) for files in file_groups.values())}")
+    print(f"  Total files: {total_files}")
     print(f"  Unique archive directories: {len(set(final_archive_dirs.values()))}")
     print(f"  Output file: {args.output}")
 
@@ -10,45 +10,159 @@ The output can be passed directly to archive_organizer.py to create archive mapp
 """
 
 import argparse
+import mmap
+import os
 import sys
 from pathlib import Path
-from typing import Set
+from typing import BinaryIO, Container, Iterable, Iterator, Optional, Set, Tuple
 
+# Optional: marisa-trie stores large path lists that share long prefixes far more compactly
+try:
+    import marisa_trie
+except ImportError:
+    marisa_trie = None
 
-def load_archived_files(mapping_file: Path) -> Set[str]:
+# Buffer size used when writing the filtered file list (large writes mean fewer write syscalls)
+OUTPUT_BUFFER_SIZE = 1024 * 1024
+
+
+def canonical_path(filepath: bytes) -> bytes:
+    """
+    Normalize a file path so equivalent spellings (e.g. '/data//x' and '/data/./x') compare equal.
+    
+    Only paths that could change are passed through os.path.normpath, so already
+    clean paths (nearly all of them) cost a few substring checks.
+    
+    Args:
+        filepath: File path (as bytes), already stripped of surrounding whitespace
+        
+    Returns:
+        Normalized file path (as bytes)
+    """
+    if b'//' in filepath or b'/.' in filepath or filepath.endswith(b'/') or filepath.startswith(b'.'):
+        return os.path.normpath(filepath)
+    return filepath
+
+
+def load_archived_files(mapping_file: Path,
+                        restrict_to: Optional[Set[bytes]] = None) -> Set[bytes]:
     """
     Load the set of already archived file paths from a mapping file.
     
+    The whole file is read in one call and parsed as bytes; paths are kept as
+    (UTF-8 encoded) bytes in canonical form, so callers should encode paths and pass
+    them through canonical_path() before testing membership.
+    
+    When restrict_to is given, the file is streamed line by line instead and only
+    archived paths in restrict_to are kept, so memory use depends on the size of
+    restrict_to rather than on the size of the mapping file.
+    
     Args:
         mapping_file: Path to the archive mapping file (TSV format)
+        restrict_to: Optional set of file paths (as bytes) to limit the result to
         
     Returns:
-        Set of file paths that are already archived
+        Set of file paths (as bytes) that are already archived
     """
-    archived_files = set()
+    archived_files: Set[bytes] = set()
     
     if not mapping_file.exists():
         print(f"Warning: Archive mapping file not found: {mapping_file}", file=sys.stderr)
         return archived_files
     
-    with open(mapping_file, 'r') as f:
-        # Skip the header line
-        header = f.readline()
+    if restrict_to is not None:
+        archived_files.update(p for p in iter_archived_files(mapping_file) if p in restrict_to)
+        return archived_files
+    
+    lines = mapping_file.read_bytes().split(b'\n')
+    add = archived_files.add
+    
+    # Skip the header line
+    for line in lines[1:]:
+        # First column (up to the first tab) is the original file path
+        tab = line.find(b'\t')
+        filepath = (line[:tab] if tab >= 0 else line).strip()
+        if filepath:
+            add(canonical_path(filepath))
+    
+    return archived_files
+
+
+def iter_archived_files(mapping_file: Path) -> Iterator[bytes]:
+    """
+    Stream the archived file paths from a mapping file, one line at a time.
+    
+    Args:
+        mapping_file: Path to the archive mapping file (TSV format); must exist
         
+    Yields:
+        Canonical file paths (as bytes) from the first column, in file order
+    """
+    with open(mapping_file, 'rb') as f:
+        next(f, None)  # Skip the header line
         for line in f:
-            line = line.strip()
-            if not line:
-                continue
+            # First column (up to the first tab) is the original file path
+            tab = line.find(b'\t')
+            filepath = (line[:tab] if tab >= 0 else line).strip()
+            if filepath:
+                yield canonical_path(filepath)
+
+
+class SortedMappingIndex:
+    """
+    Membership test against a memory-mapped archive mapping file sorted by file path.
+    
+    Lookups binary search the mapped file directly, so nothing is loaded into
+    memory up front and each lookup only touches the few pages it bisects through.
+    The mapping must keep its header line and have the remaining lines sorted
+    bytewise, e.g. with: (head -n 1 map.txt; tail -n +2 map.txt | LC_ALL=C sort)
+    """
+    __slots__ = ('_file', '_mm', '_start', '_end')
+    
+    def __init__(self, mapping_file: Path):
+        self._file = open(mapping_file, 'rb')
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if hasattr(mmap, 'MADV_RANDOM'):
+            # Lookups jump around the file, so read-ahead would only waste page cache
+            self._mm.madvise(mmap.MADV_RANDOM)
+        
+        # Skip the header line
+        self._start = self._mm.find(b'\n') + 1 or len(self._mm)
+        self._end = len(self._mm)
+    
+    def __contains__(self, filepath: bytes) -> bool:
+        mm = self._mm
+        lo, hi = self._start, self._end
+        
+        # lo and hi always sit at line starts; bisect on the line around the midpoint
+        while lo < hi:
+            mid = (lo + hi) // 2
+            line_start = mm.rfind(b'\n', lo, mid) + 1 or lo
+            line_end = mm.find(b'\n', line_start, hi)
+            if line_end < 0:
+                line_end = hi
             
-            # Split by tab - first column is the original file path
-            parts = line.split('\t')
-            if parts:
-                archived_files.add(parts[0].strip())
+            # First column (up to the first tab) is the original file path
+            line = mm[line_start:line_end]
+            tab = line.find(b'\t')
+            key = canonical_path((line[:tab] if tab >= 0 else line).strip())
+            
+            if key == filepath:
+                return True
+            if key < filepath:
+                lo = line_end + 1
+            else:
+                hi = line_start
+        
+        return False
     
-    return archived_files
+    def close(self) -> None:
+        """Unmap and close the mapping file."""
+        self._mm.close()
+        self._file.close()
 
 
-def load_ignore_list(ignore_file: Path) -> Set[str]:
+def load_ignore_list(ignore_file: Path) -> Set[bytes]:
     """
     Load the set of files to ignore from an ignore list file.
     
@@ -56,79 +170,121 @@ def load_ignore_list(ignore_file: Path) -> Set[str]:
         ignore_file: Path to the ignore list file (one path per line)
         
     Returns:
-        Set of file paths to ignore
+        Set of file paths (as bytes) to ignore
     """
-    ignore_files = set()
+    ignore_files: Set[bytes] = set()
     
     if not ignore_file.exists():
         print(f"Warning: Ignore list file not found: {ignore_file}", file=sys.stderr)
         return ignore_files
     
-    with open(ignore_file, 'r') as f:
-        for line in f:
-            line = line.strip()
-            if line and not line.startswith('#'):  # Allow comments
-                ignore_files.add(line)
+    for line in ignore_file.read_bytes().splitlines():
+        line = line.strip()
+        if line and not line.startswith(b'#'):  # Allow comments
+            ignore_files.add(canonical_path(line))
     
     return ignore_files
 
 
-def load_new_files(input_file: Path) -> list:
+def load_new_files(input_file: Path) -> Iterator[bytes]:
     """
     Load the list of new files to potentially archive.
     
+    The file is read in binary mode and streamed, so paths are never decoded.
+    
     Args:
         input_file: Path to the file containing new file paths (one per line)
         
-    Returns:
-        List of file paths from the input file
+    Yields:
+        Canonical file paths (as bytes) from the input file, one at a time
     """
-    new_files = []
-    
-    with open(input_file, 'r') as f:
+    with open(input_file, 'rb') as f:
         for line in f:
             line = line.strip()
-            if line and not line.startswith('#'):  # Allow comments
-                new_files.append(line)
+            if line and not line.startswith(b'#'):  # Allow comments
+                yield canonical_path(line)
+
+
+def build_path_trie(paths: Iterable[bytes]) -> 'marisa_trie.BinaryTrie':
+    """
+    Pack file paths into a marisa BinaryTrie.
+    
+    Paths under the same archive roots share long prefixes, which the trie stores
+    once, so it takes a fraction of the memory of the equivalent set. Pass a
+    streaming iterator (e.g. from iter_archived_files) to avoid building the set at all.
     
-    return new_files
+    Args:
+        paths: Iterable of file paths (as bytes); duplicates are stored once
+        
+    Returns:
+        BinaryTrie supporting exact membership tests with 'in'
+    """
+    return marisa_trie.BinaryTrie(paths)
 
 
-def filter_files(new_files: list, archived_files: Set[str], ignore_files: Set[str]) -> list:
+def filter_files(new_files: Iterable[bytes],
+                 archived_files: Container[bytes],
+                 ignore_files: Container[bytes],
+                 out: BinaryIO) -> Tuple[int, int, int, int]:
     """
-    Filter out already archived and ignored files from the new files list.
+    Filter out already archived and ignored files, writing the remaining files as they are found.
+    
+    All counts are gathered in the same pass, so the input never needs to be held in memory.
     
     Args:
-        new_files: List of new file paths
-        archived_files: Set of already archived file paths
-        ignore_files: Set of file paths to ignore
+        new_files: Iterable of new file paths (as bytes)
+        archived_files: Set (or trie from build_path_trie) of already archived file paths (as bytes)
+        ignore_files: Set (or trie from build_path_trie) of file paths (as bytes) to ignore
+        out: File opened in binary mode that files to archive are written to (one per line)
         
     Returns:
-        List of files that are truly new and should be archived
+        Tuple of (input_count, archived_count, ignored_count, kept_count); a file
+        that is both archived and ignored is counted in both
     """
-    filtered_files = []
+    input_count = 0
+    archived_count = 0
+    ignored_count = 0
+    kept_count = 0
+    
+    # Without an ignore list (the usual case), one lookup decides whether a file is
+    # kept; otherwise both are checked (merging them would copy the archived paths)
+    skip_files = archived_files if not ignore_files else None
+    write = out.write
     
     for filepath in new_files:
-        if filepath in archived_files:
+        input_count += 1
+        
+        if skip_files is not None and filepath not in skip_files:
+            write(filepath + b'\n')
+            kept_count += 1
             continue
-        if filepath in ignore_files:
+        
+        is_archived = filepath in archived_files
+        is_ignored = filepath in ignore_files
+        if not (is_archived or is_ignored):
+            write(filepath + b'\n')
+            kept_count += 1
             continue
-        filtered_files.append(filepath)
+        
+        archived_count += is_archived
+        ignored_count += is_ignored
     
-    return filtered_files
+    return input_count, archived_count, ignored_count, kept_count
 
 
-def write_output(output_file: Path, filtered_files: list):
+def write_output(output_file: Path, filtered_files: Iterable[bytes]):
     """
     Write the filtered file list to an output file.
     
+    Convenience wrapper for callers that already have their filtered files; the
+    paths are streamed to the file rather than joined in memory first.
+    
     Args:
         output_file: Path to the output file
-        filtered_files: List of filtered file paths
+        filtered_files: Iterable of filtered file paths (as bytes)
     """
-    with open(output_file, 'w') as f:
-        for filepath in filtered_files:
-            f.write(filepath + '\n')
+    with open(output_file, 'wb', buffering=OUTPUT_BUFFER_SIZE) as f:
+        f.writelines(filepath + b'\n' for filepath in filtered_files)
 
 
 def main():
@@ -143,6 +299,10 @@ Examples:
   # Include an ignore list
   %(prog)s -i new-files.txt -a archived-mapping.txt -g ignore-list.txt -o files-to-archive.txt
   
+  # Look up paths in a large, pre-sorted mapping file without loading it
+  (head -n 1 archived-mapping.txt; tail -n +2 archived-mapping.txt | LC_ALL=C sort) > sorted-mapping.txt
+  %(prog)s -i new-files.txt -a sorted-mapping.txt --archived-sorted -o files-to-archive.txt
+  
   # Use with archive_organizer.py
   %(prog)s -i new-files.txt -a archived-mapping.txt -o filtered.txt
   python archive_organizer.py -i filtered.txt -o new-archive-mapping.txt
@@ -182,6 +342,27 @@ Examples:
         help='Print verbose statistics about filtering'
     )
     
+    parser.add_argument(
+        '--index-input',
+        action='store_true',
+        help='Index the new file list and stream the archive mapping past it instead of loading '
+             'the whole mapping (much less memory when the mapping is far larger than the input)'
+    )
+    
+    parser.add_argument(
+        '--archived-sorted',
+        action='store_true',
+        help='The archive mapping is sorted by file path (bytewise, after the header); binary search '
+             'the memory-mapped file instead of loading it'
+    )
+    
+    parser.add_argument(
+        '--trie',
+        action='store_true',
+        help='Store archived and ignored paths in marisa-tries to reduce memory use on very large '
+             'mapping files (requires the marisa-trie package)'
+    )
+    
     args = parser.parse_args()
     
     # Validate input file exists
@@ -189,15 +370,43 @@ Examples:
         print(f"Error: Input file not found: {args.input}", file=sys.stderr)
         sys.exit(1)
     
+    if args.trie and marisa_trie is None:
+        print("Error: --trie requires the marisa-trie package (pip install marisa-trie)", file=sys.stderr)
+        sys.exit(1)
+    
+    if args.archived_sorted and args.index_input:
+        print("Error: --archived-sorted and --index-input cannot be used together", file=sys.stderr)
+        sys.exit(1)
+    
     # Load the archived files
     if args.verbose:
         print(f"Loading archived files from: {args.archived}")
-    archived_files = load_archived_files(args.archived)
-    if args.verbose:
-        print(f"  Found {len(archived_files)} archived files")
+    archived_index = None
+    if args.archived_sorted and args.archived.exists() and args.archived.stat().st_size > 0:
+        archived_index = SortedMappingIndex(args.archived)
+        archived_files = archived_index
+        if args.verbose:
+            print("  Using sorted mapping file for lookups")
+    elif args.index_input:
+        # Only archived paths that are also in the input can affect the result
+        archived_files = load_archived_files(args.archived, restrict_to=set(load_new_files(args.input)))
+        if args.verbose:
+            print(f"  Found {len(archived_files)} archived files in the input list")
+    elif args.trie:
+        # Fill the trie straight from the mapping file, without building the set first
+        if args.archived.exists():
+            archived_files = build_path_trie(iter_archived_files(args.archived))
+        else:
+            archived_files = load_archived_files(args.archived)
+        if args.verbose:
+            print(f"  Found {len(archived_files)} archived files (packed into a marisa-trie)")
+    else:
+        archived_files = load_archived_files(args.archived)
+        if args.verbose:
+            print(f"  Found {len(archived_files)} archived files")
     
     # Load the ignore list if provided
-    ignore_files = set()
+    ignore_files: Set[bytes] = set()
     if args.ignore:
         if args.verbose:
             print(f"Loading ignore list from: {args.ignore}")
@@ -205,31 +414,36 @@ Examples:
         if args.verbose:
             print(f"  Found {len(ignore_files)} files to ignore")
     
-    # Load new files
-    if args.verbose:
-        print(f"Loading new files from: {args.input}")
-    new_files = load_new_files(args.input)
-    if args.verbose:
-        print(f"  Found {len(new_files)} new files")
+    if args.trie:
+        if isinstance(archived_files, set):
+            archived_files = build_path_trie(archived_files)
+        ignore_files = build_path_trie(ignore_files)
+        if args.verbose:
+            print("  Packed archived and ignored paths into marisa-tries")
     
-    # Filter the files
+    # Stream new files through the filters straight into the output file
     if args.verbose:
-        print("Filtering files...")
-    filtered_files = filter_files(new_files, archived_files, ignore_files)
-    
-    # Write output
-    write_output(args.output, filtered_files)
+        print(f"Loading and filtering new files from: {args.input}")
+    try:
+        with open(args.output, 'wb', buffering=OUTPUT_BUFFER_SIZE) as out:
+            input_count, archived_count, ignored_count, kept_count = filter_files(
+                load_new_files(args.input), archived_files, ignore_files, out
+            )
+    finally:
+        if archived_index is not None:
+            archived_index.close()
+    if args.verbose:
+        print(f"  Found {input_count} new files")
     
     # Print summary
-    num_filtered_out = len(new_files) - len(filtered_files)
     print(f"\nSummary:")
-    print(f"  Input files:           {len(new_files)}")
-    print(f"  Already archived:      {len([f for f in new_files if f in archived_files])}")
-    print(f"  Ignored:               {len([f for f in new_files if f in ignore_files])}")
-    print(f"  New files to archive:  {len(filtered_files)}")
+    print(f"  Input files:           {input_count}")
+    print(f"  Already archived:      {archived_count}")
+    print(f"  Ignored:               {ignored_count}")
+    print(f"  New files to archive:  {kept_count}")
     print(f"\nFiltered file list written to: {args.output}")
     
-    if len(filtered_files) == 0:
+    if kept_count == 0:
         print("\n⚠ No new files to archive!")
     else:
         print(f"\n✓ Ready to pass to archive_organizer.py")
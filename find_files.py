@@ -6,141 +6,464 @@ Recursively find files with specific extensions, with optional regex-based exclu
 import argparse
 import os
 import re
+import sys
+from itertools import chain
 from pathlib import Path
-from typing import List, Optional, Pattern, Set
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterator, List, Optional, Pattern, Tuple, Union
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
 import multiprocessing
 
+# Optional: google-re2 gives linear-time (non-backtracking) regex matching
+try:
+    import re2
+except ImportError:
+    re2 = None
 
-def should_exclude(filepath: str, 
-                   filename: str,
-                   exclude_pattern: Optional[Pattern],
-                   exclude_in_path: bool) -> bool:
+# Regex parser internals, used to recognise extension patterns that are plain suffix lists
+try:
+    from re import _constants as sre_constants, _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_constants
+    import sre_parse
+
+
+# Buffer size used when writing results (large writes mean fewer write syscalls)
+OUTPUT_BUFFER_SIZE = 1024 * 1024
+
+# Maximum number of directories sent to a worker process per task
+DIRECTORY_BATCH_SIZE = 64
+
+# Maximum number of directories a worker scans per task, walking down from the ones it was sent
+DIRECTORY_SCAN_BUDGET = 512
+
+# Cap on how many literal suffixes a pattern may expand to before falling back to regex
+MAX_LITERAL_SUFFIXES = 256
+
+
+class SuffixPattern:
+    """
+    Drop-in replacement for a compiled extension regex that only matches a fixed
+    set of literal filename suffixes, using str.endswith instead of a regex search.
     """
-    Check if file should be excluded based on exclusion pattern.
+    __slots__ = ('suffixes', 'ignore_case')
+    
+    def __init__(self, suffixes: Tuple[str, ...], ignore_case: bool):
+        self.ignore_case = ignore_case
+        self.suffixes = tuple(s.lower() for s in suffixes) if ignore_case else suffixes
+    
+    def search(self, filename: str) -> bool:
+        if self.ignore_case:
+            filename = filename.lower()
+        return filename.endswith(self.suffixes)
+
+
+class Re2Pattern:
+    """
+    Wrapper for a compiled RE2 pattern that also accepts names which are not valid UTF-8.
+    
+    RE2 only takes text it can encode as UTF-8, but os.scandir returns such names
+    with their undecodable bytes surrogate-escaped. Those names are matched with
+    the undecodable bytes replaced by U+FFFD instead.
+    """
+    __slots__ = ('_search',)
+    
+    def __init__(self, pattern):
+        self._search = pattern.search
+    
+    def search(self, text: str):
+        try:
+            return self._search(text)
+        except UnicodeEncodeError:
+            return self._search(os.fsencode(text).decode('utf-8', 'replace'))
+
+
+def _expand_literals(tokens) -> Optional[List[str]]:
+    """
+    Expand parsed regex tokens into every literal string they can match.
     
     Args:
-        filepath: Full file path
-        filename: Just the filename
-        exclude_pattern: Compiled exclusion regex pattern
-        exclude_in_path: Whether to match in full path (True) or just filename (False)
+        tokens: Parsed regex tokens (from re._parser)
         
     Returns:
-        True if file should be excluded, False otherwise
+        List of literal strings, or None if the tokens are not a small finite set of literals
     """
-    if exclude_pattern is None:
-        return False
+    expansions = ['']
     
-    if exclude_in_path:
-        return exclude_pattern.search(filepath) is not None
-    else:
-        return exclude_pattern.search(filename) is not None
+    for op, arg in tokens:
+        if op is sre_constants.LITERAL:
+            options = [chr(arg)]
+        elif op is sre_constants.IN:
+            if any(item_op is not sre_constants.LITERAL for item_op, _ in arg):
+                return None
+            options = [chr(c) for _, c in arg]
+        elif op is sre_constants.SUBPATTERN:
+            _, add_flags, del_flags, sub_tokens = arg
+            if add_flags or del_flags:
+                return None
+            options = _expand_literals(sub_tokens)
+        elif op is sre_constants.BRANCH:
+            options = []
+            for branch in arg[1]:
+                branch_options = _expand_literals(branch)
+                if branch_options is None:
+                    return None
+                options.extend(branch_options)
+        elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT):
+            low, high, sub_tokens = arg
+            sub_options = _expand_literals(sub_tokens)
+            if sub_options is None or high > 4:
+                return None
+            options = []
+            for count in range(low, high + 1):
+                repeated = ['']
+                for _ in range(count):
+                    repeated = [r + o for r in repeated for o in sub_options]
+                options.extend(repeated)
+        else:
+            return None
+        
+        if options is None:
+            return None
+        expansions = [e + o for e in expansions for o in options]
+        if len(expansions) > MAX_LITERAL_SUFFIXES:
+            return None
+    
+    return expansions
+
+
+def literal_suffixes(pattern: str) -> Optional[Tuple[str, ...]]:
+    r"""
+    Get the filename suffixes matched by an end-anchored pattern of literals.
+    
+    Extension patterns such as '\.fastq\.?((gz)|(bz2)|(xz))?$' only ever match one of
+    a handful of literal endings, in which case searching with the pattern is
+    equivalent to str.endswith() on that set of endings.
+    
+    Args:
+        pattern: Regex pattern string
+        
+    Returns:
+        Tuple of literal suffixes, or None if the pattern is not of this form
+    """
+    try:
+        parsed = sre_parse.parse(pattern)
+    except Exception:
+        return None
+    
+    # Inline flags (e.g. (?m) or (?x)) could change what the pattern means
+    if parsed.state.flags & ~re.UNICODE:
+        return None
+    
+    tokens = list(parsed)
+    if not tokens or tokens[-1] not in ((sre_constants.AT, sre_constants.AT_END),
+                                        (sre_constants.AT, sre_constants.AT_END_STRING)):
+        return None
+    
+    expansions = _expand_literals(tokens[:-1])
+    if expansions is None:
+        return None
+    
+    return tuple(dict.fromkeys(expansions))
 
 
-def scan_directory_chunk(args: tuple) -> List[str]:
+def scan_directory_chunk(args: tuple) -> Tuple[List[str], List[str]]:
     """
-    Scan a directory for files matching criteria.
+    Scan a directory for files matching criteria, collecting its subdirectories in the same pass.
     
     Args:
         args: Tuple of (directory, extension_pattern, exclude_pattern, exclude_in_path)
         
     Returns:
-        List of matching file paths
+        Tuple of (matching file paths, subdirectory paths); symlinked directories are not included
     """
     directory, extension_pattern, exclude_pattern, exclude_in_path = args
     matching_files = []
+    subdirectories = []
+    extension_search = extension_pattern.search
     
     try:
-        for entry in os.scandir(directory):
-            try:
-                if entry.is_file(follow_symlinks=False):
-                    filepath = entry.path
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    # Check the name first - most entries don't match the extension, and a
+                    # matching regular file then needs only one (d_type cached) type check
                     filename = entry.name
-                    
-                    # Check if extension matches
-                    if extension_pattern.search(filename):
+                    if extension_search(filename) and entry.is_file(follow_symlinks=False):
                         # Check if should be excluded
-                        if not should_exclude(filepath, filename, exclude_pattern, exclude_in_path):
-                            matching_files.append(filepath)
-                            
-            except (PermissionError, OSError):
-                # Skip files we can't access
-                continue
+                        if exclude_pattern is None or not exclude_pattern.search(
+                                entry.path if exclude_in_path else filename):
+                            matching_files.append(entry.path)
+                        continue
+                    
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirectories.append(entry.path)
+                    
+                except (PermissionError, OSError):
+                    # Skip files we can't access
+                    continue
                 
     except (PermissionError, OSError):
         # Skip directories we can't access
         pass
     
-    return matching_files
+    return matching_files, subdirectories
 
 
-def scan_subdirectories(directory: str) -> List[str]:
+def available_cpu_count() -> int:
     """
-    Get immediate subdirectories of a directory.
+    Get the number of CPUs this process may run on.
+    
+    Honours CPU affinity (e.g. taskset or a batch scheduler's CPU allocation) where
+    the platform supports it, rather than counting every CPU in the machine.
+    
+    Returns:
+        Number of usable CPUs (at least 1)
+    """
+    if hasattr(os, 'sched_getaffinity'):
+        return max(len(os.sched_getaffinity(0)), 1)
+    return max(multiprocessing.cpu_count(), 1)
+
+
+def compile_regex(pattern: str, case_insensitive: bool) -> Pattern:
+    """
+    Compile a regex pattern, using RE2 when it is installed.
+    
+    RE2 matches in linear time without backtracking. Patterns using Perl features
+    RE2 does not support (e.g. lookarounds or backreferences) fall back to re.
     
     Args:
-        directory: Directory to scan
+        pattern: Regex pattern string
+        case_insensitive: Whether matching should be case-insensitive
         
     Returns:
-        List of subdirectory paths
+        Compiled pattern object with a re-compatible search() method
     """
-    subdirs = []
-    try:
-        for entry in os.scandir(directory):
-            try:
-                if entry.is_dir(follow_symlinks=False):
-                    subdirs.append(entry.path)
-            except (PermissionError, OSError):
-                continue
-    except (PermissionError, OSError):
-        pass
+    if re2 is not None:
+        options = re2.Options()
+        options.case_sensitive = not case_insensitive
+        options.log_errors = False
+        try:
+            return Re2Pattern(re2.compile(pattern, options))
+        except Exception:
+            pass
+    
+    return re.compile(pattern, re.IGNORECASE if case_insensitive else 0)
+
+
+def compile_patterns(extension_pattern: str,
+                     exclude_pattern: Optional[str],
+                     case_insensitive: bool) -> Tuple[Union[Pattern, SuffixPattern], Optional[Pattern]]:
+    """
+    Compile the extension and exclusion patterns.
+    
+    Args:
+        extension_pattern: Regex pattern for file matching
+        exclude_pattern: Optional regex pattern for exclusion
+        case_insensitive: Whether matching should be case-insensitive
+        
+    Returns:
+        Tuple of (extension_regex, exclude_regex); plain suffix-list extension patterns
+        are returned as a SuffixPattern, which is matched with str.endswith instead
+    """
+    # Compile extension pattern
+    extension_regex: Union[Pattern, SuffixPattern]
+    suffixes = literal_suffixes(extension_pattern)
+    if suffixes is not None:
+        extension_regex = SuffixPattern(suffixes, ignore_case=case_insensitive)
+    else:
+        extension_regex = compile_regex(extension_pattern, case_insensitive)
+    
+    # Compile exclusion pattern if provided
+    exclude_regex: Optional[Pattern] = None
+    if exclude_pattern:
+        exclude_regex = compile_regex(exclude_pattern, case_insensitive)
+    
+    return extension_regex, exclude_regex
+
+
+# Compiled (extension_regex, exclude_regex, exclude_in_path), set once in each worker process
+_worker_patterns: Optional[tuple] = None
+
+
+def init_scan_worker(extension_pattern: str,
+                     exclude_pattern: Optional[str],
+                     case_insensitive: bool,
+                     exclude_in_path: bool) -> None:
+    """
+    Process pool initializer: compile the patterns once per worker process.
+    
+    Pattern strings (rather than compiled objects) are passed in so nothing
+    compiled has to be pickled for every task.
     
-    return subdirs
+    Args:
+        extension_pattern: Regex pattern for file matching
+        exclude_pattern: Optional regex pattern for exclusion
+        case_insensitive: Whether matching should be case-insensitive
+        exclude_in_path: Whether to match exclusion in full path (True) or just filename (False)
+    """
+    global _worker_patterns
+    extension_regex, exclude_regex = compile_patterns(extension_pattern, exclude_pattern, case_insensitive)
+    _worker_patterns = (extension_regex, exclude_regex, exclude_in_path)
 
 
-def get_all_directories_parallel(root_path: str, num_workers: Optional[int] = None) -> List[str]:
+def scan_directory_batch(directories: List[str],
+                         max_directories: int = DIRECTORY_SCAN_BUDGET) -> Tuple[List[str], List[str], int]:
     """
-    Get all subdirectories recursively using parallel scanning.
+    Walk a batch of directories in a worker process (see init_scan_worker).
+    
+    Subdirectories found along the way are scanned by the same worker, depth-first,
+    until max_directories have been scanned; only the directories left over are sent
+    back to be handed out again. This keeps most subtrees inside one worker instead
+    of passing every directory path through the main process.
     
     Args:
-        root_path: Root directory to start from
-        num_workers: Number of parallel workers (default: CPU count - 2)
+        directories: Directory paths to scan
+        max_directories: Maximum number of directories to scan in this task
         
     Returns:
-        List of all directory paths
+        Tuple of (matching file paths, directory paths not yet scanned, number of directories scanned)
     """
+    extension_regex, exclude_regex, exclude_in_path = _worker_patterns
+    matching_files: List[str] = []
+    directories = list(directories)
+    num_scanned = 0
+    
+    while directories and num_scanned < max_directories:
+        files, subdirs = scan_directory_chunk(
+            (directories.pop(), extension_regex, exclude_regex, exclude_in_path)
+        )
+        matching_files.extend(files)
+        directories.extend(subdirs)
+        num_scanned += 1
+    
+    # Sort here, in parallel across workers, so the final sort only has to merge sorted runs
+    matching_files.sort()
+    
+    return matching_files, directories, num_scanned
+
+
+def walk_directories(directories: List[str],
+                     extension_regex: Union[Pattern, SuffixPattern],
+                     exclude_regex: Optional[Pattern],
+                     exclude_in_path: bool) -> Iterator[List[str]]:
+    """
+    Walk directory trees in this process, depth-first.
+    
+    Args:
+        directories: Directory paths to walk
+        extension_regex: Compiled pattern for file matching (from compile_patterns)
+        exclude_regex: Optional compiled pattern for exclusion
+        exclude_in_path: Whether to match exclusion in full path (True) or just filename (False)
+        
+    Yields:
+        Sorted list of matching file paths for each directory scanned (possibly empty)
+    """
+    directories = list(directories)
+    while directories:
+        files, subdirs = scan_directory_chunk(
+            (directories.pop(), extension_regex, exclude_regex, exclude_in_path)
+        )
+        directories.extend(subdirs)
+        files.sort()
+        yield files
+
+
+def iter_matching_files(root_path: str,
+                        extension_pattern: str,
+                        case_insensitive: bool = True,
+                        exclude_pattern: Optional[str] = None,
+                        exclude_in_path: bool = False,
+                        num_workers: Optional[int] = None) -> Iterator[List[str]]:
+    r"""
+    Find files matching extension pattern, yielding them in batches as the scan progresses.
+    
+    Each directory is listed exactly once: the scan that matches its files also
+    collects its subdirectories. Worker processes walk down from the directories
+    they are given (so pattern matching is not limited to one core by the GIL) and
+    return the directories left when their per-task budget runs out, which are then
+    handed out again in batches to keep every worker busy.
+    
+    Args:
+        root_path: Root directory to search
+        extension_pattern: Perl regex pattern for file matching (e.g., '\.fastq\.?((gz)|(bz2)|(xz))?')
+        case_insensitive: Whether matching should be case-insensitive
+        exclude_pattern: Optional Perl regex pattern for exclusion (e.g., '(trim)|(forward)|(reverse)')
+        exclude_in_path: Whether to match exclusion in full path (True) or just filename (False)
+        num_workers: Number of parallel workers (default: number of available CPUs)
+        
+    Yields:
+        Non-empty lists of matching file paths, each sorted (batches arrive in no particular order)
+    """
+    # Determine number of workers
     if num_workers is None:
-        num_workers = max([multiprocessing.cpu_count() - 2, 1])
-    
-    all_directories = [root_path]
-    directories_to_scan = [root_path]
-    seen_directories: Set[str] = {root_path}
-    
-    # Use ThreadPoolExecutor for I/O-bound directory scanning
-    with ThreadPoolExecutor(max_workers=num_workers) as executor:
-        while directories_to_scan:
-            # Submit all current directories for scanning
-            futures = {executor.submit(scan_subdirectories, d): d 
-                      for d in directories_to_scan}
-            
-            # Clear the list for the next batch
-            directories_to_scan = []
+        num_workers = available_cpu_count()
+    
+    num_directories = 0
+    
+    print(f"Scanning directory tree for matching files...", flush=True)
+    
+    # Single worker: no pool, just scan directories depth-first from a stack
+    if num_workers == 1:
+        patterns = compile_patterns(extension_pattern, exclude_pattern, case_insensitive)
+        for files in walk_directories([root_path], *patterns, exclude_in_path):
+            num_directories += 1
+            if files:
+                yield files
+        
+        print(f"Scanned {num_directories} directories", flush=True)
+        return
+    
+    # Patterns for directories rescanned in this process, compiled only if a batch fails
+    local_patterns = None
+    
+    # Scan just the root first, then submit the directories each task leaves unscanned as new batches
+    with ProcessPoolExecutor(max_workers=num_workers,
+                             initializer=init_scan_worker,
+                             initargs=(extension_pattern, exclude_pattern,
+                                       case_insensitive, exclude_in_path)) as executor:
+        pending = {executor.submit(scan_directory_batch, [root_path], 1): [root_path]}
+        failed_batches = []
+        
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
             
-            # Collect results
-            for future in as_completed(futures):
+            for future in done:
+                directories = pending.pop(future)
                 try:
-                    subdirs = future.result()
-                    for subdir in subdirs:
-                        # Avoid duplicates
-                        if subdir not in seen_directories:
-                            seen_directories.add(subdir)
-                            all_directories.append(subdir)
-                            directories_to_scan.append(subdir)
-                except Exception:
-                    # Continue even if one directory fails
-                    pass
+                    files, subdirs, num_scanned = future.result()
+                except Exception as e:
+                    failed_batches.append((directories, e))
+                    continue
+                
+                num_directories += num_scanned
+                
+                # Split small lists of subdirectories across the workers, large ones into full batches
+                batch_size = max(1, min(DIRECTORY_BATCH_SIZE, len(subdirs) // num_workers))
+                for i in range(0, len(subdirs), batch_size):
+                    batch = subdirs[i:i + batch_size]
+                    try:
+                        pending[executor.submit(scan_directory_batch, batch)] = batch
+                    except BrokenProcessPool as e:
+                        failed_batches.append((batch, e))
+                
+                if files:
+                    yield files
+            
+            # Rescan the trees of failed batches here rather than lose them (once the
+            # pool is broken, this ends up scanning everything left)
+            for directories, error in failed_batches:
+                print(f"Warning: worker failed scanning {len(directories)} directories ({error!r}); "
+                      f"scanning them in the main process", file=sys.stderr, flush=True)
+                if local_patterns is None:
+                    local_patterns = compile_patterns(extension_pattern, exclude_pattern, case_insensitive)
+                for files in walk_directories(directories, *local_patterns, exclude_in_path):
+                    num_directories += 1
+                    if files:
+                        yield files
+            failed_batches.clear()
     
-    return all_directories
+    print(f"Scanned {num_directories} directories", flush=True)
 
 
 def find_files(root_path: str,
@@ -152,59 +475,39 @@ def find_files(root_path: str,
     r"""
     Find all files matching extension pattern, optionally excluding based on pattern.
     
+    Collects every batch from iter_matching_files() into a single list.
+    
     Args:
         root_path: Root directory to search
         extension_pattern: Perl regex pattern for file matching (e.g., '\.fastq\.?((gz)|(bz2)|(xz))?')
         case_insensitive: Whether matching should be case-insensitive
         exclude_pattern: Optional Perl regex pattern for exclusion (e.g., '(trim)|(forward)|(reverse)')
         exclude_in_path: Whether to match exclusion in full path (True) or just filename (False)
-        num_workers: Number of parallel workers (default: CPU count - 2)
+        num_workers: Number of parallel workers (default: number of available CPUs)
         
     Returns:
-        List of matching file paths
+        List of matching file paths, made up of sorted runs (one per batch)
     """
-    # Compile extension pattern
-    if case_insensitive:
-        extension_regex = re.compile(extension_pattern, re.IGNORECASE)
-    else:
-        extension_regex = re.compile(extension_pattern)
-    
-    # Compile exclusion pattern if provided
-    exclude_regex: Optional[Pattern] = None
-    if exclude_pattern:
-        if case_insensitive:
-            exclude_regex = re.compile(exclude_pattern, re.IGNORECASE)
-        else:
-            exclude_regex = re.compile(exclude_pattern)
-    
-    # Determine number of workers
-    if num_workers is None:
-        num_workers = max([multiprocessing.cpu_count() - 2, 1])
-    
-    # Get all directories using parallel scanning
-    print(f"Discovering directory tree...", flush=True)
-    all_directories = get_all_directories_parallel(root_path, num_workers)
-    print(f"Found {len(all_directories)} directories to scan", flush=True)
-    
-    # Prepare arguments for each directory
-    dir_args = [(d, extension_regex, exclude_regex, exclude_in_path) 
-                for d in all_directories]
+    return list(chain.from_iterable(iter_matching_files(
+        root_path, extension_pattern, case_insensitive,
+        exclude_pattern, exclude_in_path, num_workers
+    )))
+
+
+def encode_paths(paths: List[str]) -> bytes:
+    """
+    Join file paths into newline-terminated lines, encoded with a single call.
     
-    # Process directories in parallel
-    matching_files: List[str] = []
+    Paths are encoded the way os.fsencode() does, so names that are not valid
+    UTF-8 are written back out with their original bytes.
     
-    print(f"Scanning directories for matching files...", flush=True)
-    with ThreadPoolExecutor(max_workers=num_workers) as executor:
-        futures = [executor.submit(scan_directory_chunk, arg) for arg in dir_args]
+    Args:
+        paths: File paths to write
         
-        for future in as_completed(futures):
-            try:
-                matching_files.extend(future.result())
-            except Exception as e:
-                # Continue even if one chunk fails
-                pass
-    
-    return matching_files
+    Returns:
+        Encoded lines, ready to write to a binary file or sys.stdout.buffer
+    """
+    return os.fsencode('\n'.join(paths) + '\n')
 
 
 def main() -> None:
@@ -265,7 +568,7 @@ Examples:
         '-w', '--workers',
         type=int,
         metavar='N',
-        help='Number of parallel workers (default: CPU count - 2)'
+        help='Number of parallel workers (default: number of available CPUs)'
     )
     parser.add_argument(
         '--no-parallel',
@@ -277,6 +580,11 @@ Examples:
         action='store_true',
         help='Output relative paths instead of absolute paths'
     )
+    parser.add_argument(
+        '--unsorted',
+        action='store_true',
+        help='Write results as they are found instead of sorting them after the scan finishes'
+    )
     
     args = parser.parse_args()
     
@@ -302,10 +610,41 @@ Examples:
     case_mode = "case-insensitive" if case_insensitive else "case-sensitive"
     print(f"Matching mode: {case_mode}", flush=True)
     
-    worker_count = num_workers if num_workers else max([multiprocessing.cpu_count() - 2, 1])
+    worker_count = num_workers if num_workers else available_cpu_count()
     print(f"Using {worker_count} worker(s)", flush=True)
     print("", flush=True)
     
+    # Stream results straight to the output as each batch is scanned
+    if args.unsorted:
+        batches = iter_matching_files(
+            root_path=root_path,
+            extension_pattern=args.pattern,
+            case_insensitive=case_insensitive,
+            exclude_pattern=args.exclude,
+            exclude_in_path=args.exclude_in_path,
+            num_workers=num_workers
+        )
+        found_count = 0
+        out = open(args.output, 'wb', buffering=OUTPUT_BUFFER_SIZE) if args.output else sys.stdout.buffer
+        try:
+            for files in batches:
+                if args.relative:
+                    files = [os.path.relpath(f, root_path) for f in files]
+                out.write(encode_paths(files))
+                found_count += len(files)
+                if not args.output:
+                    out.flush()
+        finally:
+            if args.output:
+                out.close()
+        
+        if args.output:
+            print(f"Found {found_count} matching files", flush=True)
+            print(f"Results written to: {args.output}", flush=True)
+        else:
+            print(f"\nFound {found_count} matching files", flush=True)
+        return
+    
     matching_files = find_files(
         root_path=root_path,
         extension_pattern=args.pattern,
@@ -315,7 +654,7 @@ Examples:
         num_workers=num_workers
     )
     
-    # Sort results
+    # Sort results (each batch is already sorted, so this only merges the runs)
     matching_files.sort()
     
     # Convert to relative paths if requested
@@ -324,14 +663,15 @@ Examples:
     
     # Output results
     if args.output:
-        with open(args.output, 'w') as f:
-            for filepath in matching_files:
-                f.write(filepath + '\n')
+        with open(args.output, 'wb', buffering=OUTPUT_BUFFER_SIZE) as f:
+            if matching_files:
+                f.write(encode_paths(matching_files))
         print(f"Found {len(matching_files)} matching files", flush=True)
         print(f"Results written to: {args.output}", flush=True)
     else:
-        for filepath in matching_files:
-            print(filepath)
+        if matching_files:
+            sys.stdout.buffer.write(encode_paths(matching_files))
+            sys.stdout.buffer.flush()
         print(f"\nFound {len(matching_files)} matching files", flush=True)
 
 
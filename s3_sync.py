@@ -1,28 +1,155 @@
 #!/usr/bin/env python3
 """
-Sync files to S3 based on archive mapping file using s3cmd.
+Sync files to S3 based on archive mapping file.
 
 This script reads the output from archive_organizer.py (a TSV file with columns:
 original_file_path, archive_directory, archived_file_path) and uploads each file
-to its designated S3 location using s3cmd.
+to its designated S3 location, either in-process with boto3 (using the endpoint
+and credentials from the s3cmd configuration) or by running s3cmd for each file.
 """
 
 import argparse
+import asyncio
+import configparser
+import gc
+import multiprocessing
 import sys
 import os
 import subprocess
 import shutil
+import stat
+from dataclasses import dataclass
+from functools import lru_cache, partial
 from pathlib import Path
-from typing import List, Tuple, Optional
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Tuple, Optional
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 
+# Optional: boto3 uploads in-process over pooled connections instead of starting s3cmd for every file
+try:
+    import boto3
+    from boto3.exceptions import S3UploadFailedError
+    from boto3.s3.transfer import TransferConfig
+    from botocore.config import Config as BotoConfig
+    from botocore.exceptions import BotoCoreError, ClientError
+except ImportError:
+    boto3 = None
 
+# Optional: aioboto3 runs --async uploads as coroutines on a single event loop
+try:
+    import aioboto3
+except ImportError:
+    aioboto3 = None
+
+# Optional: pyarrow parses large mapping files with a multithreaded C++ CSV reader
+try:
+    import pyarrow
+    import pyarrow.compute as pyarrow_compute
+    import pyarrow.csv as pyarrow_csv
+except ImportError:
+    pyarrow_csv = None
+
+
+# s3cmd configuration file holding the S3 endpoint and credentials
+DEFAULT_S3CMD_CONFIG = Path.home() / '.s3cfg'
+
+# boto3 uploads files larger than one part in parts of this size, with up to
+# MAX_CONCURRENCY_PER_FILE parts of a file in flight at once
+DEFAULT_PART_SIZE_MB = 32
+MAX_CONCURRENCY_PER_FILE = min(32, (os.cpu_count() or 1) * 2)
+
+# S3's limit on the number of parts in a multipart upload; larger files get larger parts
+MAX_PARTS_PER_UPLOAD = 10000
+
+# Size of the reads from local files that feed each part upload
+IO_CHUNK_SIZE = 1024 * 1024
+
+# Upload workers used when --workers is not given and memory-based sizing does not apply
+DEFAULT_WORKERS = 4
+
+# Memory-based sizing keeps 1/MEMORY_FRACTION of RAM worth of parts in flight,
+# with worker and part counts clamped to this range
+MEMORY_FRACTION = 32
+MIN_DERIVED_CONCURRENCY = 8
+MAX_DERIVED_CONCURRENCY = 256
+
+# Memory-based sizing never starts more workers than this (one per CPU), however
+# much memory there is; pass --workers to run more
+MAX_DERIVED_WORKERS = max(DEFAULT_WORKERS, os.cpu_count() or 1)
+
+# Default cap on the bytes of file parts in flight across all uploads: a quarter
+# of RAM, up to this many bytes (see UploadBuffer)
+MAX_DEFAULT_UPLOAD_BUFFER = 4 * 1024 ** 3
+
+# Uploads stop early if more than --max-failure-ratio of files fail, once this many have been tried
+DEFAULT_MAX_FAILURE_RATIO = 0.5
+MIN_FILES_BEFORE_STOPPING = 50
+
+# When only checking files, aim for this many batches of files per worker
+TASKS_PER_WORKER = 16
+
+# Concurrent uploads for --async when --workers is not given
+DEFAULT_ASYNC_CONCURRENCY = 256
+
+# Worker count above which boto3 uploads default to worker processes rather than threads
+PROCESS_WORKER_THRESHOLD = 4
+
+# boto3 S3 client, (part_size_mb, max_concurrency) transfer limits and UploadBuffer
+# shared by the upload threads of a process (see init_s3_client)
+_s3_client = None
+_transfer_limits = None
+_upload_buffer = None
+
+# Upload worker for the current sync, set once per process (see init_sync_worker)
+_upload_worker = None
+
+# Absolute path of the s3cmd executable, once found (saves a PATH search on every upload)
+_s3cmd_executable = 's3cmd'
+
+
+@dataclass(slots=True)
 class FileMapping:
-    """Represents a file to upload and its S3 destination."""
-    def __init__(self, local_path: str, s3_path: str, archive_dir: str):
-        self.local_path = local_path
-        self.s3_path = s3_path
-        self.archive_dir = archive_dir
+    """
+    Represents a file to upload and its S3 destination.
+    
+    bucket and s3_key hold s3_path already split by parse_s3_path (both None if
+    it has no bucket/key separator), so uploads don't need to parse it again.
+    """
+    local_path: str
+    s3_path: str
+    archive_dir: str
+    bucket: Optional[str] = None
+    s3_key: Optional[str] = None
+
+
+class UploadBuffer:
+    """
+    Caps the bytes of file parts in flight across all boto3 uploads.
+    
+    Each upload reserves the most it can have in flight (its part size times the
+    parts uploaded at once, or the whole file if smaller) before starting, and
+    waits while other uploads hold the rest. Built on multiprocessing primitives,
+    so one buffer is shared by upload threads and by worker processes (passed to
+    them through the pool initializer).
+    """
+    
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._available = multiprocessing.RawValue('q', limit)
+        self._changed = multiprocessing.Condition()
+    
+    def reserve(self, nbytes: int) -> int:
+        """Wait until nbytes (at most the whole limit) are free and take them; returns the bytes taken."""
+        nbytes = min(nbytes, self.limit)
+        with self._changed:
+            self._changed.wait_for(lambda: self._available.value >= nbytes)
+            self._available.value -= nbytes
+        return nbytes
+    
+    def release(self, nbytes: int) -> None:
+        """Return bytes taken by reserve."""
+        with self._changed:
+            self._available.value += nbytes
+            self._changed.notify_all()
 
 
 def check_s3cmd_installed() -> Tuple[bool, Optional[str]]:
@@ -38,10 +165,256 @@ def check_s3cmd_installed() -> Tuple[bool, Optional[str]]:
     return False, None
 
 
+def load_s3cmd_config(config_file: Path) -> Dict[str, str]:
+    """
+    Read the S3 endpoint and credentials from an s3cmd configuration file.
+    
+    Args:
+        config_file: Path to the s3cmd configuration file (e.g. ~/.s3cfg)
+        
+    Returns:
+        Dictionary of keyword arguments for creating a boto3 S3 client
+        (empty if the file does not exist)
+    """
+    client_kwargs: Dict[str, str] = {}
+    
+    # Secret keys may contain '%', so don't interpolate values
+    config = configparser.ConfigParser(interpolation=None)
+    if not config.read(config_file) or not config.has_section('default'):
+        return client_kwargs
+    
+    settings = config['default']
+    
+    if settings.get('access_key'):
+        client_kwargs['aws_access_key_id'] = settings['access_key']
+    if settings.get('secret_key'):
+        client_kwargs['aws_secret_access_key'] = settings['secret_key']
+    if settings.get('access_token'):
+        client_kwargs['aws_session_token'] = settings['access_token']
+    
+    host_base = settings.get('host_base', '').strip()
+    if host_base and host_base != 's3.amazonaws.com':
+        scheme = 'https' if settings.getboolean('use_https', fallback=True) else 'http'
+        client_kwargs['endpoint_url'] = f"{scheme}://{host_base}"
+    
+    return client_kwargs
+
+
+def total_memory_bytes() -> Optional[int]:
+    """
+    Get the amount of physical memory in the machine.
+    
+    Returns:
+        Total physical memory in bytes, or None if it cannot be determined
+    """
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def derive_upload_concurrency(part_size_mb: int) -> Optional[Tuple[int, int]]:
+    """
+    Size upload concurrency from the machine's memory.
+    
+    Keeps about 1/MEMORY_FRACTION of RAM worth of parts in flight per file, and
+    runs one worker per GiB of RAM, both clamped to
+    [MIN_DERIVED_CONCURRENCY, MAX_DERIVED_CONCURRENCY]. Memory can only lower the
+    defaults, though: workers are capped at MAX_DERIVED_WORKERS and parts in flight
+    at MAX_CONCURRENCY_PER_FILE, so large hosts do not start hundreds of processes.
+    
+    Args:
+        part_size_mb: Multipart part size in MiB
+        
+    Returns:
+        Tuple of (num_workers, parts_in_flight_per_file), or None if the amount
+        of memory cannot be determined
+    """
+    memory = total_memory_bytes()
+    if not memory:
+        return None
+    
+    def clamp(value: int, upper: int = MAX_DERIVED_CONCURRENCY) -> int:
+        return max(MIN_DERIVED_CONCURRENCY, min(upper, value))
+    
+    num_workers = min(MAX_DERIVED_WORKERS, clamp(memory // (1024 ** 3)))
+    max_concurrency = min(MAX_CONCURRENCY_PER_FILE,
+                          clamp(memory // (MEMORY_FRACTION * part_size_mb * 1024 * 1024)))
+    
+    return num_workers, max_concurrency
+
+
+def init_s3_client(s3cmd_config: Optional[Path],
+                   max_pool_connections: int,
+                   part_size_mb: int = DEFAULT_PART_SIZE_MB,
+                   max_concurrency: int = MAX_CONCURRENCY_PER_FILE,
+                   upload_buffer: Optional[UploadBuffer] = None) -> None:
+    """
+    Create the boto3 S3 client used for uploads.
+    
+    One client is shared by all upload threads, so connections (and their TLS
+    sessions) are reused from file to file instead of set up for every upload.
+    Also used as the process pool initializer, giving each worker process its own client.
+    
+    Args:
+        s3cmd_config: Optional s3cmd configuration file to take the endpoint and
+            credentials from (otherwise boto3's own configuration is used)
+        max_pool_connections: Size of the client's HTTP connection pool
+        part_size_mb: Multipart threshold and part size in MiB
+        max_concurrency: Maximum number of parts of a file to upload at once
+        upload_buffer: Optional cap on the bytes of parts in flight across all uploads
+    """
+    global _s3_client, _transfer_limits, _upload_buffer
+    
+    client_kwargs: Dict[str, Any] = {}
+    if s3cmd_config is not None:
+        client_kwargs = load_s3cmd_config(s3cmd_config)
+    
+    session = boto3.session.Session()
+    _s3_client = session.client(
+        's3',
+        config=BotoConfig(max_pool_connections=max_pool_connections, tcp_keepalive=True),
+        **client_kwargs
+    )
+    _transfer_limits = (part_size_mb, max_concurrency)
+    _upload_buffer = upload_buffer
+
+
+def transfer_config_for_size(file_size: int, part_size_mb: int, max_concurrency: int) -> 'TransferConfig':
+    """
+    Pick the multipart transfer settings for uploading a file of the given size.
+    
+    Parts are part_size_mb, or larger (in whole MiB) if a file would otherwise need
+    more than MAX_PARTS_PER_UPLOAD parts, and a file never gets more parts in
+    flight than it has parts.
+    
+    Args:
+        file_size: Size of the file in bytes
+        part_size_mb: Minimum multipart threshold and part size in MiB
+        max_concurrency: Maximum number of parts of a file to upload at once
+        
+    Returns:
+        TransferConfig for upload_file (shared between files with the same settings)
+    """
+    mib = 1024 * 1024
+    part_size = max(part_size_mb * mib, -(-file_size // MAX_PARTS_PER_UPLOAD))
+    part_size = -(-part_size // mib) * mib
+    num_parts = max(1, -(-file_size // part_size))
+    
+    return build_transfer_config(part_size, min(max_concurrency, num_parts))
+
+
+def buffered_bytes(file_size: int, config: 'TransferConfig') -> int:
+    """
+    Get the most bytes of a file an upload with the given settings can have in flight.
+    
+    Args:
+        file_size: Size of the file in bytes
+        config: Transfer settings from transfer_config_for_size
+        
+    Returns:
+        Number of bytes to reserve from the UploadBuffer
+    """
+    return min(file_size, config.multipart_chunksize * config.max_request_concurrency)
+
+
+@lru_cache(maxsize=None)
+def build_transfer_config(part_size: int, max_concurrency: int) -> 'TransferConfig':
+    """
+    Build the multipart transfer settings for boto3 (and aioboto3) uploads.
+    
+    Args:
+        part_size: Multipart threshold and part size in bytes
+        max_concurrency: Maximum number of parts of a file to upload at once
+        
+    Returns:
+        TransferConfig for upload_file (cached, as only a few combinations are used)
+    """
+    return TransferConfig(
+        multipart_threshold=part_size,
+        multipart_chunksize=part_size,
+        max_concurrency=max_concurrency,
+        io_chunksize=IO_CHUNK_SIZE,
+        use_threads=True
+    )
+
+
+def read_mapping_rows_arrow(mapping_file: Path, num_columns: int) -> Optional[List[FileMapping]]:
+    """
+    Read the data rows of an archive mapping file with pyarrow.
+    
+    Only well-formed files are handled here: if any row has the wrong number of
+    columns or would be skipped as malformed, None is returned so the caller can
+    fall back to the line-by-line reader, which reports each problem line.
+    
+    Args:
+        mapping_file: Path to the archive mapping file
+        num_columns: Number of columns in the header
+        
+    Returns:
+        List of FileMapping objects, or None if the file needs the line-by-line reader
+    """
+    column_names = [f"column_{i}" for i in range(num_columns)]
+    
+    try:
+        table = pyarrow_csv.read_csv(
+            mapping_file,
+            read_options=pyarrow_csv.ReadOptions(skip_rows=1, column_names=column_names, use_threads=True),
+            parse_options=pyarrow_csv.ParseOptions(delimiter='\t', quote_char=False),
+            convert_options=pyarrow_csv.ConvertOptions(
+                column_types={name: pyarrow.string() for name in column_names}
+            )
+        )
+    except (pyarrow.ArrowInvalid, OSError):
+        return None
+    
+    columns = [pyarrow_compute.utf8_trim_whitespace(table.column(name)) for name in column_names]
+    
+    # Rows starting or ending with an empty field lose it to the line-by-line reader's strip()
+    # and are reported as malformed there
+    for column in (columns[0], columns[-1]):
+        if pyarrow_compute.any(pyarrow_compute.equal(pyarrow_compute.utf8_length(column), 0)).as_py():
+            return None
+    
+    # Split the S3 paths the same way parse_s3_path does (null when there is no '/')
+    s3_paths = pyarrow_compute.replace_substring_regex(columns[2], pattern='^s3://', replacement='')
+    s3_parts = pyarrow_compute.extract_regex(s3_paths, pattern=r'^(?P<bucket>[^/]*)/(?P<key>.*)$')
+    buckets = pyarrow_compute.struct_field(s3_parts, 'bucket')
+    s3_keys = pyarrow_compute.struct_field(s3_parts, 'key')
+    
+    # FileMapping takes (local_path, s3_path, archive_dir, bucket, s3_key)
+    return list(map(FileMapping, columns[0].to_pylist(), columns[2].to_pylist(), columns[1].to_pylist(),
+                    buckets.to_pylist(), s3_keys.to_pylist()))
+
+
 def load_mapping_file(mapping_file: Path) -> List[FileMapping]:
     """
     Load file mappings from the archive mapping TSV file.
     
+    Uses pyarrow's CSV reader when it is installed, falling back to reading line
+    by line (with a warning for each malformed line) if the file is not well-formed.
+    
+    Args:
+        mapping_file: Path to the archive mapping file
+        
+    Returns:
+        List of FileMapping objects
+    """
+    # Mappings can't form reference cycles, so pause the cyclic garbage collector while
+    # creating them (otherwise it repeatedly rescans the growing list of objects)
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return _load_mapping_rows(mapping_file)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def _load_mapping_rows(mapping_file: Path) -> List[FileMapping]:
+    """
+    Read and validate the header of an archive mapping file, then load its rows (see load_mapping_file).
+    
     Args:
         mapping_file: Path to the archive mapping file
         
@@ -64,6 +437,11 @@ def load_mapping_file(mapping_file: Path) -> List[FileMapping]:
             print(f"  [original_file_path, archive_directory, archived_file_path]", file=sys.stderr)
             print(f"Got: {header}", file=sys.stderr)
         
+        if pyarrow_csv is not None:
+            arrow_mappings = read_mapping_rows_arrow(mapping_file, len(header))
+            if arrow_mappings is not None:
+                return arrow_mappings
+        
         # Read data rows
         for line_num, line in enumerate(f, start=2):
             line = line.strip()
@@ -78,11 +456,14 @@ def load_mapping_file(mapping_file: Path) -> List[FileMapping]:
             local_path = parts[0].strip()
             archive_dir = parts[1].strip()
             s3_path = parts[2].strip()
+            bucket, s3_key = parse_s3_path(s3_path)
             
             mappings.append(FileMapping(
                 local_path=local_path,
                 s3_path=s3_path,
-                archive_dir=archive_dir
+                archive_dir=archive_dir,
+                bucket=bucket,
+                s3_key=s3_key
             ))
     
     return mappings
@@ -98,10 +479,13 @@ def validate_local_file(local_path: str) -> Tuple[bool, Optional[str]]:
     Returns:
         Tuple of (is_valid, error_message)
     """
-    if not os.path.exists(local_path):
+    # One stat answers both "does it exist" and "is it a regular file"
+    try:
+        mode = os.stat(local_path).st_mode
+    except (OSError, ValueError):
         return False, f"File does not exist: {local_path}"
     
-    if not os.path.isfile(local_path):
+    if not stat.S_ISREG(mode):
         return False, f"Path is not a file: {local_path}"
     
     if not os.access(local_path, os.R_OK):
@@ -152,7 +536,10 @@ def upload_file_to_s3(local_path: str,
                       dry_run: bool = False,
                       verbose: bool = False) -> Tuple[bool, Optional[str]]:
     """
-    Upload a single file to S3 using s3cmd.
+    Upload a single file to S3.
+    
+    Uses the shared boto3 client if one has been created (see init_s3_client),
+    otherwise runs s3cmd.
     
     Args:
         local_path: Path to the local file
@@ -167,33 +554,47 @@ def upload_file_to_s3(local_path: str,
     if dry_run:
         return True, None
     
+    if _s3_client is not None:
+        try:
+            file_size = os.path.getsize(local_path)
+            config = transfer_config_for_size(file_size, *_transfer_limits)
+            if _upload_buffer is None:
+                _s3_client.upload_file(local_path, bucket, s3_key, Config=config)
+                return True, None
+            
+            reserved = _upload_buffer.reserve(buffered_bytes(file_size, config))
+            try:
+                _s3_client.upload_file(local_path, bucket, s3_key, Config=config)
+            finally:
+                _upload_buffer.release(reserved)
+            return True, None
+        except (S3UploadFailedError, ClientError, BotoCoreError) as e:
+            return False, f"Upload failed: {e}"
+        except Exception as e:
+            return False, f"Unexpected error: {e}"
+    
     # Build s3cmd command
     s3_url = build_s3_url(bucket, s3_key)
-    cmd = ['s3cmd', 'put', local_path, s3_url]
+    cmd = [_s3cmd_executable, 'put', local_path, s3_url]
     
     try:
         if verbose:
             # Show s3cmd output
-            result = subprocess.run(
-                cmd,
-                check=True,
-                capture_output=False,
-                text=True
-            )
+            subprocess.run(cmd, check=True)
         else:
-            # Capture and suppress s3cmd output
-            result = subprocess.run(
+            # Discard s3cmd's progress output, keeping only stderr (as bytes) for error messages
+            subprocess.run(
                 cmd,
                 check=True,
-                capture_output=True,
-                text=True
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE
             )
         return True, None
         
     except subprocess.CalledProcessError as e:
         error_msg = f"s3cmd failed (exit code {e.returncode})"
         if e.stderr:
-            error_msg += f": {e.stderr.strip()}"
+            error_msg += f": {e.stderr.decode('utf-8', 'replace').strip()}"
         return False, error_msg
     except FileNotFoundError:
         return False, "s3cmd command not found"
@@ -201,37 +602,81 @@ def upload_file_to_s3(local_path: str,
         return False, f"Unexpected error: {e}"
 
 
-def upload_worker(args: Tuple[FileMapping, str, bool, bool, bool]) -> Tuple[FileMapping, bool, Optional[str]]:
+def check_upload(mapping: FileMapping) -> Tuple[Optional[str], Optional[str], Optional[str]]:
     """
-    Worker function for parallel uploads.
+    Validate a mapping's local file and take its bucket from its S3 path.
     
     Args:
-        args: Tuple of (mapping, bucket_name, dry_run, validation_only, verbose)
+        mapping: File to upload
         
     Returns:
-        Tuple of (mapping, success, error_message)
+        Tuple of (bucket, s3_key, error_message); error_message is None if the file can be uploaded
     """
-    mapping, bucket_name, dry_run, validation_only, verbose = args
+    # Validate local file
+    is_valid, error_msg = validate_local_file(mapping.local_path)
+    if not is_valid:
+        return None, None, error_msg
+    
+    # S3 path was split into bucket and key when the mapping was loaded
+    if not mapping.bucket:
+        return None, None, f"Cannot determine S3 bucket from path: {mapping.s3_path}"
     
+    return mapping.bucket, mapping.s3_key, None
+
+
+def check_upload_to_bucket(mapping: FileMapping,
+                           bucket_name: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """
+    Validate a mapping's local file for upload to the given bucket.
+    
+    Args:
+        mapping: File to upload
+        bucket_name: Bucket name overriding the path's bucket
+        
+    Returns:
+        Tuple of (bucket, s3_key, error_message); error_message is None if the file can be uploaded
+    """
     # Validate local file
     is_valid, error_msg = validate_local_file(mapping.local_path)
     if not is_valid:
-        return mapping, False, error_msg
+        return None, None, error_msg
     
-    # Parse S3 path
-    bucket, s3_key = parse_s3_path(mapping.s3_path)
+    return bucket_name, mapping.s3_key, None
+
+
+def finish_upload(mapping: FileMapping,
+                  bucket: Optional[str],
+                  s3_key: Optional[str],
+                  error_msg: Optional[str],
+                  dry_run: bool,
+                  validation_only: bool,
+                  verbose: bool) -> Tuple[FileMapping, bool, Optional[str], Optional[str]]:
+    """
+    Upload a checked file, shared by the upload workers.
     
-    # Override bucket if provided
-    if bucket_name:
-        bucket = bucket_name
-    elif not bucket:
-        return mapping, False, f"Cannot determine S3 bucket from path: {mapping.s3_path}"
+    Args:
+        mapping: File to upload
+        bucket: Destination bucket from the worker's check
+        s3_key: Destination key from the worker's check
+        error_msg: Error from the worker's check (None if the file can be uploaded)
+        dry_run: If True, don't actually upload
+        validation_only: If True, only validate the file without uploading
+        verbose: If True, show s3cmd output
+        
+    Returns:
+        Tuple of (mapping, success, error_message, s3_url), where s3_url is the
+        destination URL (None if it could not be determined)
+    """
+    if error_msg is not None:
+        return mapping, False, error_msg, None
+    
+    s3_url = build_s3_url(bucket, s3_key)
     
     # If validation only, stop here
     if validation_only:
-        return mapping, True, None
+        return mapping, True, None, s3_url
     
-    # Upload file using s3cmd
+    # Upload file to S3
     success, error_msg = upload_file_to_s3(
         mapping.local_path, 
         bucket, 
@@ -240,7 +685,213 @@ def upload_worker(args: Tuple[FileMapping, str, bool, bool, bool]) -> Tuple[File
         verbose
     )
     
-    return mapping, success, error_msg
+    return mapping, success, error_msg, s3_url
+
+
+def upload_worker(mapping: FileMapping,
+                  dry_run: bool,
+                  validation_only: bool,
+                  verbose: bool) -> Tuple[FileMapping, bool, Optional[str], Optional[str]]:
+    """
+    Worker function for parallel uploads, to the bucket named in each file's S3 path.
+    
+    Args:
+        mapping: File to upload
+        dry_run: If True, don't actually upload
+        validation_only: If True, only validate the file without uploading
+        verbose: If True, show s3cmd output
+        
+    Returns:
+        Tuple of (mapping, success, error_message, s3_url)
+    """
+    return finish_upload(mapping, *check_upload(mapping), dry_run, validation_only, verbose)
+
+
+def upload_worker_to_bucket(mapping: FileMapping,
+                            bucket_name: str,
+                            dry_run: bool,
+                            validation_only: bool,
+                            verbose: bool) -> Tuple[FileMapping, bool, Optional[str], Optional[str]]:
+    """
+    Worker function for parallel uploads, to a bucket overriding the files' S3 paths.
+    
+    Args:
+        mapping: File to upload
+        bucket_name: Bucket name overriding the path's bucket
+        dry_run: If True, don't actually upload
+        validation_only: If True, only validate the file without uploading
+        verbose: If True, show s3cmd output
+        
+    Returns:
+        Tuple of (mapping, success, error_message, s3_url)
+    """
+    return finish_upload(mapping, *check_upload_to_bucket(mapping, bucket_name),
+                         dry_run, validation_only, verbose)
+
+
+def make_upload_worker(bucket_name: Optional[str],
+                       dry_run: bool,
+                       validation_only: bool,
+                       verbose: bool) -> Callable[[FileMapping], Tuple[FileMapping, bool, Optional[str], Optional[str]]]:
+    """
+    Choose the upload worker for a sync once and bind its settings, so it takes just the mapping.
+    
+    Uses functools.partial (rather than a closure) so the worker can also be sent
+    to worker processes.
+    
+    Args:
+        bucket_name: Optional bucket name to override paths
+        dry_run: If True, don't actually upload
+        validation_only: If True, only validate files without uploading
+        verbose: If True, show s3cmd output
+        
+    Returns:
+        Worker function taking a FileMapping and returning its result tuple
+    """
+    if bucket_name:
+        return partial(upload_worker_to_bucket, bucket_name=bucket_name,
+                       dry_run=dry_run, validation_only=validation_only, verbose=verbose)
+    
+    return partial(upload_worker, dry_run=dry_run,
+                   validation_only=validation_only, verbose=verbose)
+
+
+def init_sync_worker(worker: Callable[[FileMapping], Tuple[FileMapping, bool, Optional[str], Optional[str]]],
+                     client_args: Optional[tuple]) -> None:
+    """
+    Set the upload worker (and boto3 client, if any) that upload_batch uses.
+    
+    Called once before starting the threads, or as the process pool initializer, so
+    the settings are sent to each worker process once rather than with every task.
+    
+    Args:
+        worker: Worker function from make_upload_worker
+        client_args: Arguments for init_s3_client (None uploads with s3cmd)
+    """
+    global _upload_worker
+    
+    _upload_worker = worker
+    if client_args is not None:
+        init_s3_client(*client_args)
+
+
+def upload_batch(batch: List[FileMapping]) -> List[Tuple[FileMapping, bool, Optional[str], Optional[str]]]:
+    """
+    Run the upload worker over a batch of files in one task.
+    
+    An unexpected error for one file is reported as that file's failure rather
+    than abandoning the rest of the batch.
+    
+    Args:
+        batch: List of FileMapping objects
+        
+    Returns:
+        List of (mapping, success, error_message, s3_url) tuples, in batch order
+    """
+    worker = _upload_worker
+    results = []
+    
+    for mapping in batch:
+        try:
+            results.append(worker(mapping))
+        except Exception as e:
+            results.append((mapping, False, str(e), None))
+    
+    return results
+
+
+def report_results(results: List[Tuple[FileMapping, bool, Optional[str], Optional[str]]],
+                   total: int,
+                   counts: Tuple[int, int, int],
+                   dry_run: bool,
+                   validation_only: bool) -> Tuple[int, int, int]:
+    """
+    Print the outcome of a group of completed files, with a progress summary every 5 files.
+    
+    The messages are collected and written with one call per stream.
+    
+    Args:
+        results: List of (mapping, success, error_message, s3_url) tuples
+        total: Total number of files being synced
+        counts: Tuple of (completed, successful, failed) counts so far
+        dry_run: Whether this is a dry run
+        validation_only: Whether files are only being validated
+        
+    Returns:
+        Updated tuple of (completed, successful, failed) counts
+    """
+    completed, successful, failed = counts
+    out_lines = []
+    err_lines = []
+    
+    for result_mapping, success, error_msg, s3_url in results:
+        completed += 1
+        
+        if success:
+            successful += 1
+            if validation_only:
+                out_lines.append(f"✓ Valid ({completed}/{total}): {result_mapping.local_path}")
+            elif dry_run:
+                out_lines.append(f"✓ [DRY RUN] Would upload ({completed}/{total}): {result_mapping.local_path} -> {s3_url}")
+            else:
+                out_lines.append(f"✓ Uploaded ({completed}/{total}): {result_mapping.local_path} -> {s3_url}")
+        else:
+            failed += 1
+            err_lines.append(f"✗ Failed ({completed}/{total}): {result_mapping.local_path}")
+            if error_msg:
+                err_lines.append(f"  Error: {error_msg}")
+        
+        # Print progress summary every 10 files
+        if completed % 5 == 0 and completed < total:
+            out_lines.append(f"--- Progress: {completed}/{total} files processed ({successful} successful, {failed} failed) ---")
+    
+    if out_lines:
+        sys.stdout.write('\n'.join(out_lines) + '\n')
+    if err_lines:
+        sys.stderr.write('\n'.join(err_lines) + '\n')
+    
+    return completed, successful, failed
+
+
+def task_results(future, batch: List[FileMapping]) -> List[Tuple[FileMapping, bool, Optional[str], Optional[str]]]:
+    """
+    Get the results of a finished upload_batch task.
+    
+    Args:
+        future: Future of the task
+        batch: The task's list of FileMapping objects
+        
+    Returns:
+        List of (mapping, success, error_message, s3_url) tuples, with every file
+        failed if the whole task failed (e.g. its worker process died)
+    """
+    try:
+        return future.result()
+    except Exception as e:
+        return [(mapping, False, str(e), None) for mapping in batch]
+
+
+def too_many_failures(counts: Tuple[int, int, int], max_failure_ratio: float) -> bool:
+    """
+    Check whether enough files have failed to stop the sync early (e.g. revoked credentials).
+    
+    Args:
+        counts: Tuple of (completed, successful, failed) counts so far
+        max_failure_ratio: Fraction of files allowed to fail (0 never stops early)
+        
+    Returns:
+        True if more than max_failure_ratio of at least MIN_FILES_BEFORE_STOPPING files failed
+    """
+    completed, _, failed = counts
+    return (max_failure_ratio > 0 and completed >= MIN_FILES_BEFORE_STOPPING
+            and failed > completed * max_failure_ratio)
+
+
+def print_stopping(counts: Tuple[int, int, int], total: int) -> None:
+    """Report that the sync is stopping early because too many files failed."""
+    completed, _, failed = counts
+    print(f"\nError: {failed} of {completed} files failed; not starting any of the "
+          f"{total - completed} files left (see --max-failure-ratio)", file=sys.stderr)
 
 
 def sync_files(mappings: List[FileMapping],
@@ -248,9 +899,12 @@ def sync_files(mappings: List[FileMapping],
                dry_run: bool = False,
                num_workers: int = 4,
                validation_only: bool = False,
-               verbose: bool = False) -> Tuple[int, int]:
+               verbose: bool = False,
+               executor_type: str = 'thread',
+               client_args: Optional[tuple] = None,
+               max_failure_ratio: float = 0) -> Tuple[int, int]:
     """
-    Sync files to S3 in parallel using s3cmd.
+    Sync files to S3 in parallel.
     
     Args:
         mappings: List of FileMapping objects
@@ -259,72 +913,169 @@ def sync_files(mappings: List[FileMapping],
         num_workers: Number of parallel workers
         validation_only: If True, only validate files without uploading
         verbose: If True, show s3cmd output
+        executor_type: Run workers as 'thread's or as 'process'es (which keeps boto3's
+            request signing and hashing from contending for one GIL)
+        client_args: Arguments for init_s3_client to upload with boto3 (None uploads with s3cmd)
+        max_failure_ratio: Stop early, cancelling files not yet started, if more than
+            this fraction of files fail (0 never stops early)
         
     Returns:
         Tuple of (successful_count, failed_count)
     """
-    successful = 0
-    failed = 0
-    completed = 0
+    counts = (0, 0, 0)
     total = len(mappings)
     
-    # Prepare arguments for workers
-    worker_args = [(m, bucket_name, dry_run, validation_only, verbose) for m in mappings]
+    # Bind the worker's settings once, so each task only carries its mappings
+    worker = make_upload_worker(bucket_name, dry_run, validation_only, verbose)
+    
+    # Uploads go one file per task so a large file never holds up others, but when
+    # only checking files the per-task overhead dominates, so send them in batches
+    if dry_run or validation_only:
+        batch_size = max(1, total // (num_workers * TASKS_PER_WORKER))
+    else:
+        batch_size = 1
+    
+    # Set up the worker (and boto3 client) here for threads, or in each worker process for processes
+    pool_kwargs = {}
+    if executor_type == 'process':
+        pool_kwargs = {'initializer': init_sync_worker, 'initargs': (worker, client_args)}
+    else:
+        init_sync_worker(worker, client_args)
+    
+    executor_class = ProcessPoolExecutor if executor_type == 'process' else ThreadPoolExecutor
     
     # Process uploads in parallel
-    with ThreadPoolExecutor(max_workers=num_workers) as executor:
-        futures = {executor.submit(upload_worker, arg): arg[0] for arg in worker_args}
+    with executor_class(max_workers=num_workers, **pool_kwargs) as executor:
+        futures = {}
+        for i in range(0, total, batch_size):
+            batch = mappings[i:i + batch_size]
+            futures[executor.submit(upload_batch, batch)] = batch
         
         for future in as_completed(futures):
-            mapping = futures[future]
-            completed += 1
+            results = task_results(future, futures.pop(future))
+            counts = report_results(results, total, counts, dry_run, validation_only)
             
+            if too_many_failures(counts, max_failure_ratio):
+                print_stopping(counts, total)
+                # Cancel files not yet started (as_completed would wait forever on cancelled futures)
+                executor.shutdown(wait=False, cancel_futures=True)
+                break
+        
+        # Only left if stopped early: still report the files that were already under way
+        for future, batch in futures.items():
+            if not future.cancelled():
+                counts = report_results(task_results(future, batch), total, counts, dry_run, validation_only)
+    
+    _, successful, failed = counts
+    return successful, failed
+
+
+async def sync_files_async(mappings: List[FileMapping],
+                           bucket_name: Optional[str],
+                           concurrency: int,
+                           s3cmd_config: Optional[Path],
+                           part_size_mb: int = DEFAULT_PART_SIZE_MB,
+                           max_concurrency: int = MAX_CONCURRENCY_PER_FILE,
+                           upload_buffer_bytes: Optional[int] = None,
+                           max_failure_ratio: float = 0) -> Tuple[int, int]:
+    """
+    Upload files to S3 with aioboto3, as coroutines on a single event loop.
+    
+    A fixed set of `concurrency` coroutines take files from a shared iterator, so
+    many uploads can be in flight at once without a thread (or task) per file.
+    
+    Args:
+        mappings: List of FileMapping objects
+        bucket_name: Optional bucket name to override paths
+        concurrency: Number of files to upload at once
+        s3cmd_config: Optional s3cmd configuration file to take the endpoint and credentials from
+        part_size_mb: Multipart threshold and part size in MiB
+        max_concurrency: Maximum number of parts of a file to upload at once
+        upload_buffer_bytes: Optional cap on the bytes of parts in flight across all
+            uploads (as for UploadBuffer)
+        max_failure_ratio: Stop taking new files if more than this fraction of files
+            fail (0 never stops early)
+        
+    Returns:
+        Tuple of (successful_count, failed_count)
+    """
+    total = len(mappings)
+    counts = (0, 0, 0)
+    pending = iter(mappings)
+    
+    # Choose how destinations are worked out once, rather than per file
+    if bucket_name:
+        check = partial(check_upload_to_bucket, bucket_name=bucket_name)
+    else:
+        check = check_upload
+    
+    buffer_free = upload_buffer_bytes
+    buffer_changed = asyncio.Condition()
+    stopping = False
+    
+    client_kwargs: Dict[str, Any] = {}
+    if s3cmd_config is not None:
+        client_kwargs = load_s3cmd_config(s3cmd_config)
+    
+    session = aioboto3.Session()
+    async with session.client(
+        's3',
+        config=BotoConfig(max_pool_connections=concurrency * max_concurrency, tcp_keepalive=True),
+        **client_kwargs
+    ) as client:
+        
+        async def upload(local_path: str, bucket: str, s3_key: str) -> None:
+            nonlocal buffer_free
+            file_size = os.path.getsize(local_path)
+            config = transfer_config_for_size(file_size, part_size_mb, max_concurrency)
+            if buffer_free is None:
+                await client.upload_file(local_path, bucket, s3_key, Config=config)
+                return
+            
+            reserved = min(buffered_bytes(file_size, config), upload_buffer_bytes)
+            async with buffer_changed:
+                await buffer_changed.wait_for(lambda: buffer_free >= reserved)
+                buffer_free -= reserved
             try:
-                result_mapping, success, error_msg = future.result()
+                await client.upload_file(local_path, bucket, s3_key, Config=config)
+            finally:
+                async with buffer_changed:
+                    buffer_free += reserved
+                    buffer_changed.notify_all()
+        
+        async def upload_pending() -> None:
+            nonlocal counts, stopping
+            for mapping in pending:
+                if stopping:
+                    return
                 
-                if success:
-                    successful += 1
-                    if validation_only:
-                        print(f"✓ Valid ({completed}/{total}): {result_mapping.local_path}")
-                    elif dry_run:
-                        # Parse S3 path for display
-                        bucket, s3_key = parse_s3_path(result_mapping.s3_path)
-                        if bucket_name:
-                            bucket = bucket_name
-                        s3_url = build_s3_url(bucket, s3_key)
-                        print(f"✓ [DRY RUN] Would upload ({completed}/{total}): {result_mapping.local_path} -> {s3_url}")
-                    else:
-                        # Parse S3 path for display
-                        bucket, s3_key = parse_s3_path(result_mapping.s3_path)
-                        if bucket_name:
-                            bucket = bucket_name
-                        s3_url = build_s3_url(bucket, s3_key)
-                        print(f"✓ Uploaded ({completed}/{total}): {result_mapping.local_path} -> {s3_url}")
-                else:
-                    failed += 1
-                    print(f"✗ Failed ({completed}/{total}): {result_mapping.local_path}", file=sys.stderr)
-                    if error_msg:
-                        print(f"  Error: {error_msg}", file=sys.stderr)
+                bucket, s3_key, error_msg = check(mapping)
+                s3_url = None
+                if error_msg is None:
+                    s3_url = build_s3_url(bucket, s3_key)
+                    try:
+                        await upload(mapping.local_path, bucket, s3_key)
+                    except (S3UploadFailedError, ClientError, BotoCoreError) as e:
+                        error_msg = f"Upload failed: {e}"
+                    except Exception as e:
+                        error_msg = f"Unexpected error: {e}"
                 
-                # Print progress summary every 10 files
-                if completed % 5 == 0 and completed < total:
-                    print(f"--- Progress: {completed}/{total} files processed ({successful} successful, {failed} failed) ---")
-                        
-            except Exception as e:
-                failed += 1
-                print(f"✗ Failed ({completed}/{total}): {mapping.local_path}", file=sys.stderr)
-                print(f"  Error: {e}", file=sys.stderr)
+                counts = report_results([(mapping, error_msg is None, error_msg, s3_url)],
+                                        total, counts, dry_run=False, validation_only=False)
                 
-                # Print progress summary every 10 files
-                if completed % 5 == 0 and completed < total:
-                    print(f"--- Progress: {completed}/{total} files processed ({successful} successful, {failed} failed) ---")
+                if not stopping and too_many_failures(counts, max_failure_ratio):
+                    stopping = True
+                    print_stopping(counts, total)
+        
+        await asyncio.gather(*(upload_pending() for _ in range(min(concurrency, total))))
     
+    _, successful, failed = counts
     return successful, failed
 
 
 def main():
     parser = argparse.ArgumentParser(
-        description='Sync files to S3 based on archive mapping file using s3cmd.',
+        description='Sync files to S3 based on archive mapping file.',
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog="""
 Examples:
@@ -347,11 +1098,12 @@ Examples:
   %(prog)s archive_mapping.txt --bucket my-bucket --dry-run --workers 10
   
   # Show s3cmd output (verbose mode)
-  %(prog)s archive_mapping.txt --verbose
+  %(prog)s archive_mapping.txt --uploader s3cmd --verbose
 
 Requirements:
-  - s3cmd must be installed and configured
-  - Run 's3cmd --configure' to set up AWS credentials
+  - s3cmd must be configured: run 's3cmd --configure' to set up the endpoint and credentials
+  - boto3 uploads (the default when boto3 is installed) read the same ~/.s3cfg
+  - s3cmd uploads (--uploader s3cmd) need s3cmd installed
         """
     )
     
@@ -369,8 +1121,67 @@ Requirements:
     parser.add_argument(
         '-w', '--workers',
         type=int,
-        default=4,
-        help='Number of parallel upload workers (default: 4)'
+        help='Number of parallel upload workers (default: sized from memory for boto3 uploads, '
+             f'at most one per CPU, otherwise {DEFAULT_WORKERS}; set this to run more)'
+    )
+    
+    parser.add_argument(
+        '--executor',
+        choices=['auto', 'thread', 'process'],
+        default='auto',
+        help='Run upload workers as threads or processes (default: auto, which uses processes '
+             f'for boto3 uploads with more than {PROCESS_WORKER_THRESHOLD} workers; the number of '
+             'processes is set by --workers)'
+    )
+    
+    parser.add_argument(
+        '--async',
+        dest='use_async',
+        action='store_true',
+        help='Upload with aioboto3 on a single event loop, with --workers files in flight at once '
+             f'(default: {DEFAULT_ASYNC_CONCURRENCY}; requires the aioboto3 package)'
+    )
+    
+    parser.add_argument(
+        '--uploader',
+        choices=['boto3', 's3cmd'],
+        default='boto3' if boto3 is not None else 's3cmd',
+        help='Upload in-process with boto3 over reused connections, or run s3cmd for each file '
+             '(default: boto3 if installed, otherwise s3cmd)'
+    )
+    
+    parser.add_argument(
+        '--s3cmd-config',
+        type=Path,
+        default=DEFAULT_S3CMD_CONFIG,
+        help='s3cmd configuration file that boto3 uploads take the endpoint and credentials from '
+             f'(default: {DEFAULT_S3CMD_CONFIG})'
+    )
+    
+    parser.add_argument(
+        '--part-size-mb',
+        type=int,
+        default=DEFAULT_PART_SIZE_MB,
+        help='Size in MiB of the parts boto3 uploads larger files in; larger parts mean fewer '
+             f'requests per file (default: {DEFAULT_PART_SIZE_MB}; files that would need more than '
+             f'{MAX_PARTS_PER_UPLOAD:,} parts get larger parts)'
+    )
+    
+    parser.add_argument(
+        '--max-upload-buffer-mb',
+        type=int,
+        help='Cap in MiB on the file parts boto3 uploads have in flight at once, across all workers; '
+             f'uploads wait for room under it (default: a quarter of RAM, up to '
+             f'{MAX_DEFAULT_UPLOAD_BUFFER // 1024 ** 2}; 0 disables)'
+    )
+    
+    parser.add_argument(
+        '--max-failure-ratio',
+        type=float,
+        default=DEFAULT_MAX_FAILURE_RATIO,
+        help='Stop uploading if more than this fraction of files fail, once '
+             f'{MIN_FILES_BEFORE_STOPPING} have been tried (default: {DEFAULT_MAX_FAILURE_RATIO}; '
+             '0 never stops early; not applied to --dry-run or --validate-only)'
     )
     
     parser.add_argument(
@@ -393,14 +1204,41 @@ Requirements:
     
     args = parser.parse_args()
     
-    # Check if s3cmd is installed
-    s3cmd_available, s3cmd_path = check_s3cmd_installed()
-    if not s3cmd_available:
-        print("\nError: s3cmd is not installed or not found in PATH!", file=sys.stderr)
+    global _s3cmd_executable
+    
+    if args.part_size_mb < 5:
+        print("Error: --part-size-mb must be at least 5 (the S3 minimum part size)", file=sys.stderr)
         sys.exit(1)
     
-    if args.verbose:
-        print(f"Using s3cmd: {s3cmd_path}")
+    if args.uploader == 'boto3':
+        if boto3 is None:
+            print("\nError: --uploader boto3 requires the boto3 package", file=sys.stderr)
+            sys.exit(1)
+        
+        if args.verbose:
+            if args.s3cmd_config.exists():
+                print(f"Using boto3 with endpoint and credentials from: {args.s3cmd_config}")
+            else:
+                print(f"s3cmd config not found ({args.s3cmd_config}); using boto3's own configuration")
+    else:
+        # Check if s3cmd is installed
+        s3cmd_available, s3cmd_path = check_s3cmd_installed()
+        if not s3cmd_available:
+            print("\nError: s3cmd is not installed or not found in PATH!", file=sys.stderr)
+            sys.exit(1)
+        
+        if args.verbose:
+            print(f"Using s3cmd: {s3cmd_path}")
+        
+        _s3cmd_executable = s3cmd_path
+    
+    if args.use_async:
+        if args.uploader != 'boto3':
+            print("\nError: --async requires --uploader boto3", file=sys.stderr)
+            sys.exit(1)
+        if aioboto3 is None:
+            print("\nError: --async requires the aioboto3 package", file=sys.stderr)
+            sys.exit(1)
     
     # Validate mapping file exists
     if not args.mapping_file.exists():
@@ -426,18 +1264,85 @@ Requirements:
         print("\n[VALIDATION MODE - Only checking local files]")
     if args.bucket:
         print(f"Using bucket: {args.bucket}")
-    print(f"Parallel workers: {args.workers}")
+    
+    # boto3 uploads share one client (and its connection pool) per process; s3cmd does its own uploads
+    uploading_with_boto3 = args.uploader == 'boto3' and not (args.dry_run or args.validate_only)
+    
+    # Async uploads are limited by --workers files in flight, not by worker processes
+    use_async = args.use_async and uploading_with_boto3
+    if use_async and args.workers is None:
+        args.workers = DEFAULT_ASYNC_CONCURRENCY
+    
+    # Size boto3 uploads from the machine's memory unless told otherwise
+    max_concurrency = MAX_CONCURRENCY_PER_FILE
+    derived = derive_upload_concurrency(args.part_size_mb) if uploading_with_boto3 else None
+    if derived is not None:
+        derived_workers, max_concurrency = derived
+        if args.workers is None:
+            args.workers = derived_workers
+        if args.verbose:
+            print(f"Memory-based sizing: {derived_workers} workers, "
+                  f"up to {max_concurrency} parts in flight per file")
+    if args.workers is None:
+        args.workers = DEFAULT_WORKERS
+    
+    # Cap the parts in flight across all uploads, as many workers each with many parts can exhaust memory
+    upload_buffer_bytes = None
+    if uploading_with_boto3:
+        if args.max_upload_buffer_mb is None:
+            memory = total_memory_bytes()
+            upload_buffer_bytes = min(memory // 4, MAX_DEFAULT_UPLOAD_BUFFER) if memory else MAX_DEFAULT_UPLOAD_BUFFER
+        elif args.max_upload_buffer_mb > 0:
+            upload_buffer_bytes = args.max_upload_buffer_mb * 1024 * 1024
+        if args.verbose and upload_buffer_bytes:
+            print(f"Upload buffer: up to {upload_buffer_bytes // 1024 ** 2} MiB of parts in flight")
+    
+    # Threads suffice for s3cmd (the work happens in its own processes) and for checks only
+    executor_type = args.executor
+    if executor_type == 'auto':
+        if uploading_with_boto3 and args.workers > PROCESS_WORKER_THRESHOLD:
+            executor_type = 'process'
+        else:
+            executor_type = 'thread'
+    
+    client_args = None
+    if uploading_with_boto3 and not use_async:
+        # Each process runs one upload at a time, while threads share a single pool
+        files_per_client = 1 if executor_type == 'process' else args.workers
+        upload_buffer = UploadBuffer(upload_buffer_bytes) if upload_buffer_bytes else None
+        client_args = (args.s3cmd_config, files_per_client * max_concurrency,
+                       args.part_size_mb, max_concurrency, upload_buffer)
+    
+    if use_async:
+        print(f"Concurrent uploads: {args.workers} (async)")
+    else:
+        print(f"Parallel workers: {args.workers} ({'processes' if executor_type == 'process' else 'threads'})")
     print("")
     
     # Sync files
-    successful, failed = sync_files(
-        mappings=mappings,
-        bucket_name=args.bucket,
-        dry_run=args.dry_run,
-        num_workers=args.workers,
-        validation_only=args.validate_only,
-        verbose=args.verbose
-    )
+    if use_async:
+        successful, failed = asyncio.run(sync_files_async(
+            mappings=mappings,
+            bucket_name=args.bucket,
+            concurrency=args.workers,
+            s3cmd_config=args.s3cmd_config,
+            part_size_mb=args.part_size_mb,
+            max_concurrency=max_concurrency,
+            upload_buffer_bytes=upload_buffer_bytes,
+            max_failure_ratio=args.max_failure_ratio
+        ))
+    else:
+        successful, failed = sync_files(
+            mappings=mappings,
+            bucket_name=args.bucket,
+            dry_run=args.dry_run,
+            num_workers=args.workers,
+            validation_only=args.validate_only,
+            verbose=args.verbose,
+            executor_type=executor_type,
+            client_args=client_args,
+            max_failure_ratio=0 if args.dry_run or args.validate_only else args.max_failure_ratio
+        )
     
     # Print summary
     print("\n" + "=" * 80)
@@ -446,6 +1351,8 @@ Requirements:
     print(f"Total files:     {len(mappings)}")
     print(f"Successful:      {successful}")
     print(f"Failed:          {failed}")
+    if successful + failed < len(mappings):
+        print(f"Not attempted:   {len(mappings) - successful - failed}")
     
     if args.dry_run:
         print("\n[DRY RUN - No actual uploads performed]")